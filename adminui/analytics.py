@@ -0,0 +1,276 @@
+"""
+Grading analytics per problem and per cohort (department, year, semester).
+
+GradeAggregate/GradeBucket rows are adjusted with F() updates as
+submissions are created, evaluated and deleted (see adminui.signals), so
+the analytics page never aggregates over Submission. ``rebuild()``
+recomputes everything in one pass for bulk loads and repairs.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from student.models import Submission
+from .models import GradeAggregate, GradeBucket
+
+BUCKETS = 10
+
+
+def bucket_for(marks, total_marks):
+    if total_marks <= 0:
+        return BUCKETS - 1
+    return min(BUCKETS - 1, max(0, marks * BUCKETS // total_marks))
+
+
+def cohort_key(department, year, semester):
+    return f"{department}/{year}/{semester}"
+
+
+def cohort_label(department, year, semester):
+    return f"{department} · Year {year} · Sem {semester}"
+
+
+def _scopes(problem_id, problem_title, department, year, semester):
+    return [
+        (GradeAggregate.PROBLEM, str(problem_id), problem_title),
+        (GradeAggregate.COHORT, cohort_key(department, year, semester), cohort_label(department, year, semester)),
+    ]
+
+
+def _scopes_for(submission):
+    student, problem = submission.student, submission.problem
+    return _scopes(problem.pk, problem.title, student.department, student.year, student.semester)
+
+
+def _aggregate_ids(scopes):
+    ids = []
+    for scope, key, label in scopes:
+        aggregate, _ = GradeAggregate.objects.get_or_create(scope=scope, key=key, defaults={"label": label})
+        ids.append(aggregate.pk)
+    return ids
+
+
+def _add_mark(ids, marks, total_marks, sign):
+    GradeAggregate.objects.filter(pk__in=ids).update(
+        evaluated=F("evaluated") + sign,
+        marks_sum=F("marks_sum") + sign * marks,
+        possible_sum=F("possible_sum") + sign * total_marks,
+    )
+    bucket = bucket_for(marks, total_marks)
+    for aggregate_id in ids:
+        GradeBucket.objects.get_or_create(aggregate_id=aggregate_id, bucket=bucket)
+    GradeBucket.objects.filter(aggregate_id__in=ids, bucket=bucket).update(count=F("count") + sign)
+
+
+def submission_added(submission):
+    with transaction.atomic():
+        ids = _aggregate_ids(_scopes_for(submission))
+        GradeAggregate.objects.filter(pk__in=ids).update(submitted=F("submitted") + 1)
+        if submission.faculty_marks is not None:
+            _add_mark(ids, submission.faculty_marks, submission.problem.total_marks, 1)
+
+
+def submission_removed(submission):
+    with transaction.atomic():
+        ids = _aggregate_ids(_scopes_for(submission))
+        GradeAggregate.objects.filter(pk__in=ids).update(submitted=F("submitted") - 1)
+        if submission.faculty_marks is not None:
+            _add_mark(ids, submission.faculty_marks, submission.problem.total_marks, -1)
+
+
+def submissions_removed(submissions, scopes=(GradeAggregate.PROBLEM, GradeAggregate.COHORT)):
+    """
+    Take every submission in the ``submissions`` queryset out of the
+    ``scopes`` aggregates, e.g. all of a student's submissions before the
+    student is deleted: one read and a few grouped updates, whatever the count.
+    """
+    totals, buckets = _recompute(submissions)
+    totals = {scope_key: values for scope_key, values in totals.items() if scope_key[0] in scopes}
+    if not totals:
+        return
+
+    with transaction.atomic():
+        aggregate_ids = _aggregate_ids_by_key({scope_key: values["label"] for scope_key, values in totals.items()})
+        _increment(GradeAggregate, {
+            aggregate_ids[scope_key]: {field: -values[field]
+                                       for field in ("submitted", "evaluated", "marks_sum", "possible_sum")}
+            for scope_key, values in totals.items()
+        })
+        wanted = {(aggregate_ids[scope_key], bucket): -count
+                  for scope_key in totals for bucket, count in enumerate(buckets[scope_key]) if count}
+        bucket_ids = _bucket_ids(wanted)
+        _increment(GradeBucket, {bucket_ids[pair]: {"count": delta} for pair, delta in wanted.items()})
+
+
+def marks_changed(submission, previous_marks):
+    marks_changed_many([(submission, previous_marks)])
+
+
+def marks_changed_many(changes):
+    """
+    Apply (submission, previous marks) pairs, e.g. one batch grading save.
+
+    Deltas are summed per aggregate and per bucket first and applied with
+    one CASE update per table, so the query count does not grow with the
+    number of submissions.
+    """
+    labels = {}
+    totals = defaultdict(lambda: {"evaluated": 0, "marks_sum": 0, "possible_sum": 0})
+    bucket_deltas = defaultdict(int)
+    for submission, previous_marks in changes:
+        if previous_marks == submission.faculty_marks:
+            continue
+        total_marks = submission.problem.total_marks
+        for scope, key, label in _scopes_for(submission):
+            labels[(scope, key)] = label
+            for marks, sign in ((previous_marks, -1), (submission.faculty_marks, 1)):
+                if marks is None:
+                    continue
+                row = totals[(scope, key)]
+                row["evaluated"] += sign
+                row["marks_sum"] += sign * marks
+                row["possible_sum"] += sign * total_marks
+                bucket_deltas[(scope, key, bucket_for(marks, total_marks))] += sign
+    if not labels:
+        return
+
+    with transaction.atomic():
+        aggregate_ids = _aggregate_ids_by_key(labels)
+        _increment(GradeAggregate, {aggregate_ids[scope_key]: values for scope_key, values in totals.items()})
+        wanted = {(aggregate_ids[(scope, key)], bucket): delta
+                  for (scope, key, bucket), delta in bucket_deltas.items() if delta}
+        bucket_ids = _bucket_ids(wanted)
+        _increment(GradeBucket, {bucket_ids[pair]: {"count": delta} for pair, delta in wanted.items()})
+
+
+def _aggregate_ids_by_key(labels):
+    """{(scope, key): aggregate id} for ``labels``' keys, creating missing aggregates."""
+    def existing():
+        lookup = Q()
+        for scope in {scope for scope, _ in labels}:
+            lookup |= Q(scope=scope, key__in=[key for s, key in labels if s == scope])
+        return {(scope, key): pk for scope, key, pk in
+                GradeAggregate.objects.filter(lookup).values_list("scope", "key", "pk")}
+
+    ids = existing()
+    if len(ids) < len(labels):
+        GradeAggregate.objects.bulk_create(
+            [GradeAggregate(scope=scope, key=key, label=label)
+             for (scope, key), label in labels.items() if (scope, key) not in ids],
+            ignore_conflicts=True,  # created concurrently: fine, re-read below
+        )
+        ids = existing()
+    return ids
+
+
+def _bucket_ids(pairs):
+    """{(aggregate id, bucket): GradeBucket id} for ``pairs``, creating missing rows."""
+    def existing():
+        rows = GradeBucket.objects.filter(aggregate_id__in={pk for pk, _ in pairs},
+                                          bucket__in={bucket for _, bucket in pairs})
+        return {(aggregate_id, bucket): pk for aggregate_id, bucket, pk in
+                rows.values_list("aggregate_id", "bucket", "pk") if (aggregate_id, bucket) in pairs}
+
+    if not pairs:
+        return {}
+    ids = existing()
+    if len(ids) < len(pairs):
+        GradeBucket.objects.bulk_create(
+            [GradeBucket(aggregate_id=pk, bucket=bucket) for pk, bucket in pairs if (pk, bucket) not in ids],
+            ignore_conflicts=True,
+        )
+        ids = existing()
+    return ids
+
+
+def _increment(model, deltas):
+    """Add {pk: {field: delta}} to the rows in one UPDATE ... SET field = field + CASE pk ... END."""
+    deltas = {pk: values for pk, values in deltas.items() if any(values.values())}
+    if not deltas:
+        return
+    fields = {field for values in deltas.values() for field in values}
+    model.objects.filter(pk__in=deltas).update(**{
+        field: F(field) + Case(*[When(pk=pk, then=Value(values.get(field, 0))) for pk, values in deltas.items()],
+                               default=Value(0), output_field=IntegerField())
+        for field in fields
+    })
+
+
+def forget_problem(problem_id):
+    GradeAggregate.objects.filter(scope=GradeAggregate.PROBLEM, key=str(problem_id)).delete()
+
+
+def _recompute(submissions):
+    totals = {}
+    buckets = defaultdict(lambda: [0] * BUCKETS)
+    rows = submissions.values_list(
+        "problem_id", "problem__title", "problem__total_marks",
+        "student__department", "student__year", "student__semester", "faculty_marks",
+    )
+    for problem_id, title, total_marks, department, year, semester, marks in rows.iterator(chunk_size=2000):
+        for scope, key, label in _scopes(problem_id, title, department, year, semester):
+            row = totals.setdefault((scope, key), {"label": label, "submitted": 0, "evaluated": 0,
+                                                   "marks_sum": 0, "possible_sum": 0})
+            row["submitted"] += 1
+            if marks is not None:
+                row["evaluated"] += 1
+                row["marks_sum"] += marks
+                row["possible_sum"] += total_marks
+                buckets[(scope, key)][bucket_for(marks, total_marks)] += 1
+    return totals, buckets
+
+
+def _store(totals, buckets):
+    for (scope, key), values in totals.items():
+        aggregate = GradeAggregate.objects.create(scope=scope, key=key, **values)
+        GradeBucket.objects.bulk_create([
+            GradeBucket(aggregate=aggregate, bucket=bucket, count=count)
+            for bucket, count in enumerate(buckets[(scope, key)]) if count
+        ])
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every aggregate from Submission and return the number of rows written."""
+    totals, buckets = _recompute(Submission.objects.all())
+    GradeAggregate.objects.all().delete()
+    _store(totals, buckets)
+    return len(totals)
+
+
+@transaction.atomic
+def rebuild_cohort(department, year, semester):
+    """Recompute one cohort, e.g. after a student moved to another department or semester."""
+    totals, buckets = _recompute(Submission.objects.filter(
+        student__department=department, student__year=year, student__semester=semester,
+    ))
+    totals = {k: v for k, v in totals.items() if k[0] == GradeAggregate.COHORT}
+    GradeAggregate.objects.filter(scope=GradeAggregate.COHORT, key=cohort_key(department, year, semester)).delete()
+    _store(totals, buckets)
+
+
+def report(scope):
+    """Rows for the analytics page, read only from the aggregate tables."""
+    if not GradeAggregate.objects.exists() and Submission.objects.exists():
+        rebuild()  # first use after deploying: seed from a one-off full pass
+
+    aggregates = GradeAggregate.objects.filter(scope=scope).prefetch_related("buckets").order_by("label")
+    rows = []
+    for aggregate in aggregates:
+        histogram = [0] * BUCKETS
+        for bucket in aggregate.buckets.all():
+            histogram[bucket.bucket] = bucket.count
+        evaluated = aggregate.evaluated
+        rows.append({
+            "label": aggregate.label,
+            "submitted": aggregate.submitted,
+            "evaluated": evaluated,
+            "completion": round(100 * evaluated / aggregate.submitted) if aggregate.submitted else 0,
+            "average": round(aggregate.marks_sum / evaluated, 1) if evaluated else None,
+            "average_percent": round(100 * aggregate.marks_sum / aggregate.possible_sum) if aggregate.possible_sum else None,
+            "histogram": histogram,
+            "histogram_max": max(histogram) or 1,
+        })
+    return rows
@@ -0,0 +1,204 @@
+"""
+Read-only JSON listings behind the dashboards' table paging.
+
+Each resource maps public field names to ORM paths and is read with
+``values(...)``, so a page turn is one keyset-paged SELECT of the requested
+columns (no model instances, no COUNT) serialized straight to JSON. Clients
+pick columns with ``?fields=a,b`` and page with the ``next``/``previous``
+cursors, which are the same signed cursors the HTML pages use.
+
+Results always come in seek-key order, newest first. For ``students?q=``
+that means every match ordered by id, not by relevance: the HTML search
+ranks the best matches first but stops at search.MAX_RESULTS, while the API
+has to page through all of them with stable cursors.
+"""
+
+from datetime import date, datetime
+
+from django.utils import timezone
+
+from adminui import exports
+from adminui.models import Faculty, Problem
+from adminui.pagination import KeysetPaginator
+from student.models import Student, Submission
+from student.search import matching_students
+
+MAX_LIMIT = 100
+
+STAFF = "staff"
+FACULTY = "faculty"
+
+
+def _submission_filters(queryset, params):
+    return queryset.filter(**exports.parse_filters(params))
+
+
+def _faculty_filters(queryset, params):
+    search = params.get("search", "").strip()
+    if search:
+        queryset = queryset.filter(faculty_id__icontains=search)
+    return queryset
+
+
+def _problem_filters(queryset, params):
+    if params.get("date"):
+        try:
+            day = date.fromisoformat(params["date"])
+        except ValueError:
+            raise ValueError(f"Invalid date: {params['date']} (expected YYYY-MM-DD)")
+        queryset = queryset.filter(created_at__date=day)
+    return queryset
+
+
+RESOURCES = {
+    "submissions": {
+        "model": Submission,
+        "keys": ("submitted_at", "id"),
+        "per_page": 7,
+        "access": (STAFF, FACULTY),
+        "filter": _submission_filters,
+        "student_search": ("search", "student_id"),
+        "fields": {
+            "id": "id",
+            "student_name": "student__full_name",
+            "student_id": "student__student_id",
+            "problem_id": "problem_id",
+            "problem_title": "problem__title",
+            "total_marks": "problem__total_marks",
+            "uploaded_by": "problem__created_by__username",
+            "submitted_at": "submitted_at",
+            "faculty_marks": "faculty_marks",
+            "faculty_remarks": "faculty_remarks",
+            "evaluated_by": "faculty__username",
+            "preview_image": "preview__image",
+            "preview_mime": "preview__mime_type",
+            "preview_size": "preview__size_bytes",
+            "preview_pages": "preview__page_count",
+            "lease_faculty_id": "lease__faculty_id",
+            "lease_holder": "lease__faculty__username",
+            "lease_expires_at": "lease__expires_at",
+        },
+    },
+    "students": {
+        "model": Student,
+        "keys": ("id",),
+        "per_page": 12,
+        "access": (STAFF,),
+        # Every match of the indexed prefix search, paged by id (not ranked; see the module docstring)
+        "student_search": ("q", "id"),
+        "fields": {
+            "id": "id",
+            "student_id": "student_id",
+            "full_name": "full_name",
+            "gender": "gender",
+            "department": "department",
+            "year": "year",
+            "semester": "semester",
+            "created_at": "created_at",
+        },
+    },
+    "faculty": {
+        "model": Faculty,
+        "keys": ("id",),
+        "per_page": 7,
+        "access": (STAFF,),
+        "filter": _faculty_filters,
+        "fields": {
+            "id": "id",
+            "username": "username",
+            "faculty_id": "faculty_id",
+            "gender": "gender",
+            "department": "department",
+        },
+    },
+    "problems": {
+        "model": Problem,
+        "keys": ("created_at", "id"),
+        "per_page": 5,
+        "access": (STAFF, FACULTY),
+        "filter": _problem_filters,
+        "fields": {
+            "id": "id",
+            "title": "title",
+            "total_marks": "total_marks",
+            "created_at": "created_at",
+            "max_upload_mb": "max_upload_mb",
+            "allowed_extensions": "allowed_extensions",
+            "uploaded_by": "created_by__username",
+            "description": "description",
+        },
+        # Descriptions can be long; only sent when asked for by name
+        "default_exclude": ("description",),
+    },
+}
+
+
+def parse_fields(spec, value):
+    """Requested public field names, in order; raise ValueError for unknown ones."""
+    if not value:
+        return [name for name in spec["fields"] if name not in spec.get("default_exclude", ())]
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in spec["fields"]]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return names
+
+
+def parse_limit(spec, value):
+    if not value:
+        return spec["per_page"]
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be a number")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _local(value):
+    # Same wall-clock time the HTML pages print, so scripts can show it as-is
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value)
+    return value
+
+
+def _prepare(resource, params):
+    spec = RESOURCES[resource]
+    names = parse_fields(spec, params.get("fields"))
+    paths = [spec["fields"][name] for name in names]
+    queryset = spec["model"].objects.all()
+    if "filter" in spec:
+        queryset = spec["filter"](queryset, params)
+    if "student_search" in spec:
+        param, field = spec["student_search"]
+        term = params.get(param, "").strip()
+        if term:
+            queryset = queryset.filter(**{field + "__in": matching_students(term)})
+    return spec, names, paths, queryset
+
+
+def _paginator(spec, paths, queryset, params):
+    # The seek keys always ride along so the cursor can be built from the last row
+    queryset = queryset.values(*dict.fromkeys(paths + list(spec["keys"])))
+    return KeysetPaginator(queryset, parse_limit(spec, params.get("limit")), keys=spec["keys"])
+
+
+def _result(names, paths, page_obj):
+    return {
+        "results": [{name: _local(row[path]) for name, path in zip(names, paths)} for row in page_obj],
+        "next": page_obj.next_cursor,
+        "previous": page_obj.previous_cursor,
+    }
+
+
+def page(resource, params):
+    """One page of ``resource`` as a JSON-ready dict; raise ValueError for bad parameters."""
+    spec, names, paths, queryset = _prepare(resource, params)
+    paginator = _paginator(spec, paths, queryset, params)
+    return _result(names, paths, paginator.get_page(params.get("cursor")))
+
+
+async def apage(resource, params):
+    """page() for async views."""
+    spec, names, paths, queryset = _prepare(resource, params)
+    paginator = _paginator(spec, paths, queryset, params)
+    return _result(names, paths, await paginator.aget_page(params.get("cursor")))
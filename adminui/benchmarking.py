@@ -0,0 +1,185 @@
+"""Shared helpers for the bench_* management commands."""
+
+import statistics
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from adminui import analytics, stats
+from adminui.middleware import QueryTimer
+from adminui.models import Faculty, Problem
+from adminui.passwords import hash_password
+from student import leaderboard, search
+from student.models import Student, Submission
+
+PASSWORD = "bench-password"
+
+
+@contextmanager
+def benchmark_database():
+    """Run the block against a throw-away test database, never the real one."""
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed(students=100, problems=5, faculty=5, submissions_per_student=3):
+    """Create a cohort with bulk inserts; all accounts share PASSWORD."""
+    student_password = hash_password("student", PASSWORD)
+    faculty_password = hash_password("faculty", PASSWORD)
+    Problem.objects.bulk_create(
+        Problem(title=f"Problem {i}", description=f"Bench problem {i}\nSecond line.", total_marks=10)
+        for i in range(problems)
+    )
+    Faculty.objects.bulk_create(
+        Faculty(username=f"Faculty {i}", password=faculty_password, faculty_id=f"BENCHF{i:04d}",
+                gender="other", department="CSE")
+        for i in range(faculty)
+    )
+    Student.objects.bulk_create(
+        Student(full_name=f"Bench Student {i}", student_id=f"BENCH{i:06d}", password=student_password,
+                gender="other", year=1 + i % 4, semester=1 + i % 8, department=("CSE", "ECE", "MECH")[i % 3])
+        for i in range(students)
+    )
+    problem_ids = list(Problem.objects.order_by("created_at", "id").values_list("id", flat=True))
+    Submission.objects.bulk_create(
+        (
+            Submission(student_id=student_id, problem_id=problem_id, file=f"submissions/bench_{student_id}_{problem_id}.pdf")
+            for student_id in Student.objects.values_list("id", flat=True)
+            for problem_id in problem_ids[:submissions_per_student]
+        ),
+        batch_size=1000,
+    )
+    # bulk_create skips signals, so bring the derived tables up to date
+    stats.rebuild()
+    analytics.rebuild()
+    leaderboard.rebuild()
+    search.rebuild_index()
+    User.objects.create_user("bench-admin", password=PASSWORD, is_staff=True)
+
+
+def admin_client():
+    client = Client()
+    client.login(username="bench-admin", password=PASSWORD)
+    return client
+
+
+def student_client(student_id="BENCH000000"):
+    client = Client()
+    client.post("/student/auth/", {"form_type": "login", "student_id": student_id, "password": PASSWORD})
+    return client
+
+
+def faculty_client(faculty_id="BENCHF0000"):
+    client = Client()
+    client.post("/faculty/login/", {"faculty_id": faculty_id, "password": PASSWORD})
+    return client
+
+
+def time_requests(client, url, count):
+    """GET ``url`` ``count`` times and return the latencies in seconds."""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.get(url)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return latencies
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, wall_time=None):
+    wall_time = wall_time if wall_time is not None else sum(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / wall_time, 1) if wall_time else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+class FlowRecorder:
+    """Latency and query count per named step, collected from many client threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = defaultdict(lambda: {"latencies": [], "queries": [], "errors": 0})
+
+    def request(self, step, send, path, data=None, expect=(200,)):
+        """Send one request with ``send`` (client.get/client.post) and record it under ``step``."""
+        timer = QueryTimer()
+        response = None
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timer):
+                response = send(path, data) if data is not None else send(path)
+        except Exception:
+            pass  # the test client re-raises view errors; count them and keep the client going
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            entry = self.steps[step]
+            entry["latencies"].append(elapsed)
+            entry["queries"].append(timer.queries)
+            entry["errors"] += response is None or response.status_code not in expect
+        return response
+
+    def report(self, wall_times):
+        """Summaries per step; ``wall_times`` maps each step to the wall time of the phase it ran in."""
+        report = {}
+        for step, entry in self.steps.items():
+            summary = summarize(entry["latencies"], wall_times.get(step))
+            summary["queries_per_request"] = round(statistics.fmean(entry["queries"]), 2) if entry["queries"] else 0
+            summary["max_queries"] = max(entry["queries"], default=0)
+            summary["errors"] = entry["errors"]
+            report[step] = summary
+        return report
+
+
+def run_concurrently(target, jobs):
+    """Run ``target(job)`` for every job on its own thread; return the wall time in seconds."""
+    def worker(job):
+        try:
+            target(job)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(job,)) for job in jobs]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def git_commit():
+    """Short hash of the checked-out commit, for labelling reports."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, timeout=5)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
@@ -0,0 +1,163 @@
+"""
+Bulk CSV import of students and faculty.
+
+Rows are streamed from the CSV and handled in chunks: each chunk is
+validated, checked against existing IDs with one IN query, has its
+passwords hashed on a process pool, and is written with bulk_create inside
+a transaction. Every rejected row is reported with its line number.
+"""
+
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from adminui import stats
+from adminui.models import Faculty
+from adminui.passwords import get_role_hasher
+from student import search
+from student.models import Student
+
+GENDERS = {"male", "female", "other"}
+
+ROLES = {
+    "student": {
+        "model": Student,
+        "id_field": "student_id",
+        "columns": ["full_name", "student_id", "password", "gender", "year", "semester", "department"],
+        "integers": ["year", "semester"],
+    },
+    "faculty": {
+        "model": Faculty,
+        "id_field": "faculty_id",
+        "columns": ["username", "faculty_id", "password", "gender", "department"],
+        "integers": [],
+    },
+}
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    errors: list = field(default_factory=list)  # (line number, message)
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+def _init_worker():
+    django.setup()
+
+
+def _hash(args):
+    role, raw_password = args
+    return make_password(raw_password, hasher=get_role_hasher(role))
+
+
+def _validate(role, row):
+    spec = ROLES[role]
+    cleaned = {}
+    for column in spec["columns"]:
+        value = (row.get(column) or "").strip()
+        if not value:
+            return None, f"{column} is required"
+        # Checked here so one long cell is a row error, not a DataError aborting the chunk
+        max_length = spec["model"]._meta.get_field(column).max_length if column != "password" else None
+        if max_length and len(value) > max_length:
+            return None, f"{column} is longer than {max_length} characters"
+        cleaned[column] = value
+    for column in spec["integers"]:
+        try:
+            cleaned[column] = int(cleaned[column])
+        except ValueError:
+            return None, f"{column} must be a number"
+    if role == "faculty":
+        cleaned["gender"] = cleaned["gender"].lower()
+        if cleaned["gender"] not in GENDERS:
+            return None, "gender must be male, female or other"
+    return cleaned, None
+
+
+def _write_chunk(role, pool, chunk, report):
+    spec = ROLES[role]
+    model, id_field = spec["model"], spec["id_field"]
+    existing = set(model.objects.filter(**{f"{id_field}__in": [row[id_field] for _, row in chunk]})
+                   .values_list(id_field, flat=True))
+    rows = []
+    for line, row in chunk:
+        if row[id_field] in existing:
+            report.errors.append((line, f"{id_field} {row[id_field]} already exists"))
+        else:
+            rows.append((line, row))
+    if not rows:
+        return
+
+    hashes = pool.map(_hash, [(role, row["password"]) for _, row in rows], chunksize=16)
+    objects = [model(**{**row, "password": hashed}) for (_, row), hashed in zip(rows, hashes)]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objects)
+    except IntegrityError:
+        # Someone registered one of these IDs meanwhile: insert one by one to isolate it
+        objects = _create_one_by_one(model, id_field, rows, objects, report)
+    report.created += len(objects)
+
+    # bulk_create bypasses post_save, so update the derived tables here
+    stats.bump(role, len(objects))
+    if role == "student":
+        search.index_students(Student.objects.filter(student_id__in=[obj.student_id for obj in objects]))
+
+
+def _create_one_by_one(model, id_field, rows, objects, report):
+    created = []
+    for (line, row), obj in zip(rows, objects):
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj])
+            created.append(obj)
+        except IntegrityError:
+            report.errors.append((line, f"{id_field} {row[id_field]} already exists"))
+    return created
+
+
+def import_csv(role, lines, chunk_size=500, workers=None):
+    """
+    Import ``role`` accounts from an iterable of CSV text lines and return an ImportReport.
+
+    Passwords are hashed on ``workers`` processes, settings.BULK_IMPORT_WORKERS
+    by default, so an import from the web UI cannot take every CPU.
+    """
+    spec = ROLES[role]
+    workers = workers or getattr(settings, "BULK_IMPORT_WORKERS", 2)
+    report = ImportReport()
+    reader = csv.DictReader(lines)
+    missing = [column for column in spec["columns"] if column not in (reader.fieldnames or [])]
+    if missing:
+        report.errors.append((1, "missing columns: " + ", ".join(missing)))
+        return report
+
+    seen = set()
+    chunk = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for row in reader:
+            line = reader.line_num
+            cleaned, error = _validate(role, row)
+            if error is None and cleaned[spec["id_field"]] in seen:
+                error = f"duplicate {spec['id_field']} {cleaned[spec['id_field']]} in this file"
+            if error:
+                report.errors.append((line, error))
+                continue
+            seen.add(cleaned[spec["id_field"]])
+            chunk.append((line, cleaned))
+            if len(chunk) >= chunk_size:
+                _write_chunk(role, pool, chunk, report)
+                chunk = []
+        if chunk:
+            _write_chunk(role, pool, chunk, report)
+    report.errors.sort()
+    return report
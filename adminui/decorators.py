@@ -1,7 +1,17 @@
 from django.shortcuts import redirect
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
 
 def admin_required(view_func):
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            if not user.is_authenticated or not user.is_staff:
+                return redirect('login')
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
         if not request.user.is_authenticated or not request.user.is_staff:
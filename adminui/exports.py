@@ -0,0 +1,134 @@
+"""
+Marks export.
+
+Rows are read as plain tuples in pages of CHUNK_SIZE, each page a separate
+query that seeks past the last (submitted_at, id) seen, so only one page is
+in memory at a time whatever the database driver. (``.iterator()`` would not
+do: mysqlclient buffers the entire result client-side.) They are written out
+as they arrive: CSV straight into a StreamingHttpResponse, XLSX through
+openpyxl's write-only workbook (when openpyxl is installed).
+"""
+
+import csv
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+from student.models import Submission
+from .pagination import KeysetPaginator
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+CHUNK_SIZE = 2000
+
+COLUMNS = [
+    ("Student ID", "student__student_id"),
+    ("Student Name", "student__full_name"),
+    ("Department", "student__department"),
+    ("Year", "student__year"),
+    ("Semester", "student__semester"),
+    ("Problem", "problem__title"),
+    ("Total Marks", "problem__total_marks"),
+    ("Marks", "faculty_marks"),
+    ("Remarks", "faculty_remarks"),
+    ("Evaluated By", "faculty__username"),
+    ("Submitted At", "submitted_at"),
+]
+
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+FORMATS = ["csv", "xlsx"] if Workbook is not None else ["csv"]
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def parse_filters(params):
+    """Turn request/command parameters into queryset filters; raise ValueError on bad input."""
+    filters = {}
+    if params.get("problem"):
+        filters["problem_id"] = _integer(params["problem"], "problem")
+    if params.get("department"):
+        filters["student__department"] = params["department"]
+    if params.get("year"):
+        filters["student__year"] = _integer(params["year"], "year")
+    if params.get("semester"):
+        filters["student__semester"] = _integer(params["semester"], "semester")
+    # Whole days in the local time zone, compared as a range so the index on submitted_at is usable
+    if params.get("date_from"):
+        filters["submitted_at__gte"] = _day_start(params["date_from"])
+    if params.get("date_to"):
+        filters["submitted_at__lt"] = _day_start(params["date_to"]) + timedelta(days=1)
+    return filters
+
+
+def _integer(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+
+
+def _day_start(value):
+    try:
+        day = value if isinstance(value, date) else date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value} (expected YYYY-MM-DD)")
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_rows(filters, chunk_size=CHUNK_SIZE):
+    """Yield one tuple per submission, oldest first, header values excluded."""
+    submissions = Submission.objects.filter(**filters)
+    seek = KeysetPaginator(submissions, chunk_size)._seek
+    fields = [field for _, field in COLUMNS] + ["id"]
+    last = None
+    while True:
+        page = submissions if last is None else submissions.filter(seek(last, "gt"))
+        rows = list(page.order_by("submitted_at", "id").values_list(*fields)[:chunk_size])
+        for row in rows:
+            submitted_at = timezone.localtime(row[-2]).replace(tzinfo=None)
+            yield tuple(_cell(value) for value in row[:-2]) + (submitted_at.strftime("%Y-%m-%d %H:%M"),)
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][-2:]
+
+
+def _cell(value):
+    # Spreadsheets run text starting with these as a formula; a leading ' keeps it plain text
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(rows):
+    """Yield the CSV export line by line."""
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows, fh):
+    """Write the export to ``fh`` as an .xlsx workbook."""
+    if Workbook is None:
+        raise RuntimeError("XLSX export needs openpyxl installed")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Marks")
+    sheet.append([header for header, _ in COLUMNS])
+    for row in rows:
+        sheet.append(row)
+    workbook.save(fh)
+
+
+def filename(filters, extension):
+    stamp = timezone.localdate().strftime("%Y%m%d")
+    suffix = f"_problem{filters['problem_id']}" if "problem_id" in filters else ""
+    return f"marks{suffix}_{stamp}.{extension}"
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from adminui import benchmarking
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests per second on the admin, faculty and student dashboards in a "
+        "throw-away test database. Run once per settings module to compare, e.g. "
+        "--settings=myproject.settings_production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per dashboard")
+        parser.add_argument("--students", type=int, default=300)
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES["default"]
+        self.stdout.write(
+            f"session engine: {settings.SESSION_ENGINE}\n"
+            f"cache backend:  {settings.CACHES['default']['BACKEND']}\n"
+            f"CONN_MAX_AGE:   {database.get('CONN_MAX_AGE', 0)}"
+        )
+        with benchmarking.benchmark_database():
+            benchmarking.seed(students=options["students"])
+            pages = {
+                "admin dashboard": (benchmarking.admin_client(), "/dashboard/"),
+                "faculty dashboard": (benchmarking.faculty_client(), "/faculty/dashboard/"),
+                "student dashboard": (benchmarking.student_client(), "/student/student/"),
+            }
+            for name, (client, url) in pages.items():
+                client.get(url)  # warm up caches and connections
+                result = benchmarking.summarize(benchmarking.time_requests(client, url, options["requests"]))
+                self.stdout.write(
+                    f"{name:18} {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms"
+                )
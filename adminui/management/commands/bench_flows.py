@@ -0,0 +1,116 @@
+import json
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from adminui import benchmarking
+from adminui.models import Problem
+from student.models import Submission
+
+STUDENT_STEPS = ("student_login", "student_dashboard", "submit_solution")
+FACULTY_STEPS = ("faculty_login", "faculty_dashboard", "evaluate_view", "evaluate_save")
+ADMIN_STEPS = ("admin_dashboard",)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the real student, faculty and admin flows with concurrent clients against a throw-away "
+        "test database and print latency percentiles, throughput and queries per request as JSON. "
+        "Use --settings=myproject.settings_bench for SQLite, or BENCH_DATABASE=mysql for local MySQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=200, help="Students who log in and submit")
+        parser.add_argument("--problems", type=int, default=5)
+        parser.add_argument("--faculty", type=int, default=4, help="Concurrent faculty graders")
+        parser.add_argument("--history", type=int, default=2,
+                            help="Older submissions per student seeded before the run (< --problems)")
+        parser.add_argument("--clients", type=int, default=8, help="Concurrent student/admin clients")
+        parser.add_argument("--admin-requests", type=int, default=25, help="Admin dashboard loads per client")
+        parser.add_argument("--file-kb", type=int, default=64, help="Size of each uploaded solution")
+        parser.add_argument("--output", "-o", help="Write the JSON report here instead of stdout")
+        parser.add_argument("--label", default="", help="Free text stored in the report, e.g. a branch name")
+
+    def handle(self, *args, **options):
+        students, clients = options["students"], max(1, options["clients"])
+        history = min(options["history"], options["problems"] - 1)
+        payload = b"%PDF-1.4\n" + b"0" * (options["file_kb"] * 1024)
+        recorder = benchmarking.FlowRecorder()
+        wall_times = {}
+        media_root = tempfile.mkdtemp(prefix="bench-media-")
+        try:
+            with override_settings(MEDIA_ROOT=media_root), benchmarking.benchmark_database():
+                benchmarking.seed(students=students, problems=options["problems"],
+                                  faculty=options["faculty"], submissions_per_student=history)
+                problem_ids = list(Problem.objects.order_by("created_at", "id").values_list("id", flat=True))
+                target = problem_ids[history]  # the first problem each student has not submitted yet
+
+                def student_flow(student_ids):
+                    for student_id in student_ids:
+                        client = Client()
+                        recorder.request("student_login", client.post, "/student/auth/", {
+                            "form_type": "login", "student_id": student_id, "password": benchmarking.PASSWORD,
+                        }, expect=(302,))
+                        recorder.request("student_dashboard", client.get, "/student/student/")
+                        upload = SimpleUploadedFile("solution.pdf", payload, content_type="application/pdf")
+                        recorder.request("submit_solution", client.post,
+                                         f"/student/student/submit/{target}/", {"file": upload})
+
+                ids = [f"BENCH{i:06d}" for i in range(students)]
+                wall = benchmarking.run_concurrently(student_flow, [ids[n::clients] for n in range(clients)])
+                wall_times.update(dict.fromkeys(STUDENT_STEPS, wall))
+
+                pending = list(Submission.objects.filter(problem_id=target).values_list("id", flat=True))
+                graders = max(1, options["faculty"])
+
+                def faculty_flow(job):
+                    faculty_id, submission_ids = job
+                    client = Client()
+                    recorder.request("faculty_login", client.post, "/faculty/login/", {
+                        "faculty_id": faculty_id, "password": benchmarking.PASSWORD,
+                    }, expect=(302,))
+                    for n, submission_id in enumerate(submission_ids):
+                        recorder.request("faculty_dashboard", client.get, "/faculty/dashboard/")
+                        url = f"/faculty/evaluate/{submission_id}/"
+                        recorder.request("evaluate_view", client.get, url)
+                        recorder.request("evaluate_save", client.post, url, {
+                            "marks": n % 11, "remarks": "Benchmark evaluation",
+                        }, expect=(302,))
+
+                jobs = [(f"BENCHF{n:04d}", pending[n::graders]) for n in range(graders)]
+                wall = benchmarking.run_concurrently(faculty_flow, jobs)
+                wall_times.update(dict.fromkeys(FACULTY_STEPS, wall))
+
+                def admin_flow(_):
+                    client = benchmarking.admin_client()
+                    for _ in range(options["admin_requests"]):
+                        recorder.request("admin_dashboard", client.get, "/dashboard/")
+
+                wall = benchmarking.run_concurrently(admin_flow, range(clients))
+                wall_times.update(dict.fromkeys(ADMIN_STEPS, wall))
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        steps = recorder.report(wall_times)
+        report = {
+            "label": options["label"],
+            "commit": benchmarking.git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "database": connection.vendor,
+            "settings": settings.SETTINGS_MODULE,
+            "parameters": {key: options[key] for key in (
+                "students", "problems", "faculty", "history", "clients", "admin_requests", "file_kb")},
+            "steps": {step: steps[step] for step in STUDENT_STEPS + FACULTY_STEPS + ADMIN_STEPS if step in steps},
+        }
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(text + "\n")
+        else:
+            self.stdout.write(text)
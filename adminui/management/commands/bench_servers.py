@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from adminui import benchmarking
+from student.models import Submission
+
+HOST = "127.0.0.1"
+
+# name -> (who is logged in, path); the download path is filled in after seeding
+ENDPOINTS = {
+    "admin_dashboard": ("admin", "/dashboard/"),
+    "student_list": ("admin", "/students/"),
+    "faculty_list": ("admin", "/faculty/"),
+    "api_students": ("admin", "/api/students/"),
+    "faculty_dashboard": ("faculty", "/faculty/dashboard/"),
+    "student_dashboard": ("student", "/student/student/"),
+    "download": ("student", None),
+}
+
+
+async def fetch(port, request, timeout):
+    """One GET on a fresh connection; return (status or None, seconds)."""
+    async def exchange():
+        reader, writer = await asyncio.open_connection(HOST, port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            while await reader.read(64 * 1024):
+                pass  # read the whole body, as a browser would
+        finally:
+            writer.close()
+        return int(status_line.split()[1])
+
+    start = time.perf_counter()
+    try:
+        status = await asyncio.wait_for(exchange(), timeout)
+    except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+        status = None
+    return status, time.perf_counter() - start
+
+
+async def load(port, request, concurrency, per_connection, timeout):
+    """``concurrency`` clients each sending ``per_connection`` requests back to back."""
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for _ in range(per_connection):
+            status, elapsed = await fetch(port, request, timeout)
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    summary = benchmarking.summarize(latencies, time.perf_counter() - start)
+    summary["concurrency"] = concurrency
+    summary["errors"] = errors
+    return summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the app with gunicorn (WSGI) and with uvicorn (ASGI), the same number of worker processes "
+        "each, load the dashboards, lists, JSON API and a submission "
+        "download with rising numbers of concurrent connections, and print throughput, latency and the "
+        "highest concurrency each server sustained as JSON. Works in a throw-away test database; use "
+        "--settings=myproject.settings_bench."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=200)
+        parser.add_argument("--problems", type=int, default=5)
+        parser.add_argument("--concurrency", default="10,50,100,200",
+                            help="Comma-separated numbers of simultaneous connections to try")
+        parser.add_argument("--requests", type=int, default=5, help="Requests per connection slot at each level")
+        parser.add_argument("--workers", type=int, default=2, help="Server processes for both servers")
+        parser.add_argument("--threads", type=int, default=4, help="Threads per gunicorn worker")
+        parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a request counts as failed")
+        parser.add_argument("--p95-limit-ms", type=float, default=1000.0,
+                            help="A level is sustained when p95 stays under this and under 1%% of requests fail")
+        parser.add_argument("--file-kb", type=int, default=512, help="Size of the downloaded submission")
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                            help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}")
+        parser.add_argument("--servers", default="wsgi,asgi", help="Comma-separated subset of: wsgi, asgi")
+        parser.add_argument("--output", "-o", help="Write the JSON report here instead of stdout")
+        parser.add_argument("--label", default="", help="Free text stored in the report, e.g. a branch name")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",") if level.strip()]
+        except ValueError:
+            raise CommandError("--concurrency takes comma-separated numbers, e.g. 10,50,100")
+        endpoints = [name.strip() for name in options["endpoints"].split(",") if name.strip()]
+        servers = [name.strip() for name in options["servers"].split(",") if name.strip()]
+        unknown = [name for name in endpoints if name not in ENDPOINTS] + [
+            name for name in servers if name not in ("wsgi", "asgi")]
+        if unknown:
+            raise CommandError(f"Unknown endpoint or server: {', '.join(unknown)}")
+        if "asgi" in servers and find_spec("uvicorn") is None:
+            raise CommandError("uvicorn is not installed (pip install uvicorn), or pass --servers=wsgi")
+        # No runserver fallback: one process against uvicorn's --workers would not be a fair comparison
+        if "wsgi" in servers and find_spec("gunicorn") is None:
+            raise CommandError("gunicorn is not installed (pip install gunicorn), or pass --servers=asgi")
+
+        report_servers = {}
+        media_root = tempfile.mkdtemp(prefix="bench-media-")
+        try:
+            with override_settings(MEDIA_ROOT=media_root), benchmarking.benchmark_database():
+                benchmarking.seed(students=options["students"], problems=options["problems"],
+                                  faculty=1, submissions_per_student=1)
+                paths = {name: path for name, (_, path) in ENDPOINTS.items()}
+                paths["download"] = self.seed_download(media_root, options["file_kb"])
+                cookies = {
+                    "admin": self.cookie_header(benchmarking.admin_client()),
+                    "faculty": self.cookie_header(benchmarking.faculty_client()),
+                    "student": self.cookie_header(benchmarking.student_client()),
+                }
+                # The servers inherit DJANGO_SETTINGS_MODULE (set by --settings) and are pointed at this run's data
+                env = dict(os.environ, BENCH_DATABASE_NAME=str(connection.settings_dict["NAME"]),
+                           BENCH_MEDIA_ROOT=media_root)
+
+                for kind in servers:
+                    with self.serve(kind, env, options) as (port, description):
+                        results = {}
+                        for name in endpoints:
+                            request = (f"GET {paths[name]} HTTP/1.1\r\nHost: {HOST}\r\n"
+                                       f"Cookie: {cookies[ENDPOINTS[name][0]]}\r\nConnection: close\r\n\r\n").encode()
+                            runs = [asyncio.run(load(port, request, level, options["requests"], options["timeout"]))
+                                    for level in levels]
+                            results[name] = {"sustained_concurrency": self.sustained(runs, options["p95_limit_ms"]),
+                                             "levels": runs}
+                        report_servers[kind] = {"server": description, "endpoints": results}
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {
+            "label": options["label"],
+            "commit": benchmarking.git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "database": connection.vendor,
+            "settings": settings.SETTINGS_MODULE,
+            "parameters": {key: options[key] for key in (
+                "students", "problems", "concurrency", "requests", "workers", "threads", "timeout",
+                "p95_limit_ms", "file_kb")},
+            "servers": report_servers,
+        }
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(text + "\n")
+        else:
+            self.stdout.write(text)
+
+    def seed_download(self, media_root, file_kb):
+        """Write a real file behind the first seeded submission of the student the benchmark logs in as."""
+        submission = Submission.objects.filter(student__student_id="BENCH000000").order_by("id").first()
+        path = os.path.join(media_root, submission.file.name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(b"%PDF-1.4\n" + b"0" * (file_kb * 1024))
+        return f"/student/submission/{submission.id}/file/"
+
+    def cookie_header(self, client):
+        return "; ".join(f"{name}={morsel.value}" for name, morsel in client.cookies.items())
+
+    def sustained(self, runs, p95_limit_ms):
+        """Highest concurrency level that kept p95 under the limit with under 1% failed requests."""
+        best = 0
+        for run in runs:
+            total = run["requests"] + run["errors"]
+            if total and run["errors"] / total < 0.01 and run["p95_ms"] <= p95_limit_ms:
+                best = max(best, run["concurrency"])
+        return best
+
+    @contextmanager
+    def serve(self, kind, env, options):
+        with socket.socket() as sock:
+            sock.bind((HOST, 0))
+            port = sock.getsockname()[1]
+        workers, threads = options["workers"], options["threads"]
+        if kind == "asgi":
+            command = [sys.executable, "-m", "uvicorn", "myproject.asgi:application", "--host", HOST,
+                       "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+            description = f"uvicorn, {workers} worker(s)"
+        else:
+            command = [sys.executable, "-m", "gunicorn", "myproject.wsgi:application", "--bind", f"{HOST}:{port}",
+                       "--workers", str(workers), "--threads", str(threads), "--log-level", "warning"]
+            description = f"gunicorn, {workers} worker(s) x {threads} thread(s)"
+
+        log = tempfile.TemporaryFile()
+        process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            self.wait_for_port(port, process, log)
+            yield port, description
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log.close()
+
+    def wait_for_port(self, port, process, log, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                log.seek(0)
+                raise CommandError(f"Server exited with {process.returncode}:\n{log.read().decode(errors='replace')[-2000:]}")
+            try:
+                with socket.create_connection((HOST, port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server did not start listening on port {port} within {timeout}s")
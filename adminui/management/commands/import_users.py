@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from adminui.bulk_import import ROLES, import_csv
+
+
+class Command(BaseCommand):
+    help = "Import students or faculty from a CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("role", choices=sorted(ROLES))
+        parser.add_argument("path", help="CSV file with a header row")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows per bulk insert")
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing processes (default: settings.BULK_IMPORT_WORKERS)")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as fh:
+                report = import_csv(options["role"], fh, options["chunk_size"], options["workers"])
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for line, message in report.errors:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(f"{report.created} created, {report.rejected} rejected."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from adminui import analytics
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-problem and per-cohort grading aggregates from submissions"
+
+    def handle(self, *args, **options):
+        rows = analytics.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} aggregate rows."))
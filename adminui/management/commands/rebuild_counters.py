@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from adminui import stats
+
+
+class Command(BaseCommand):
+    help = "Recount students, faculty, problems and submissions for the admin dashboard"
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*",
+                            help="Entities to rebuild: %s (default: all)" % ", ".join(stats.COUNTED_MODELS))
+
+    def handle(self, *args, **options):
+        unknown = set(options["names"]) - set(stats.COUNTED_MODELS)
+        if unknown:
+            raise CommandError(f"Unknown entities: {', '.join(sorted(unknown))}")
+
+        totals = stats.rebuild(options["names"] or None)
+        for name, total in totals.items():
+            self.stdout.write(f"{name}: {total}")
+        self.stdout.write(self.style.SUCCESS("Counters rebuilt."))
@@ -0,0 +1,118 @@
+"""
+In-process request metrics.
+
+MetricsMiddleware (adminui.middleware) records one sample per request
+under the resolved URL name. The last METRICS_WINDOW samples per view are
+kept for percentiles, plus lifetime counts and sums. Each worker process
+keeps its own numbers; the metrics endpoint reports the process that
+serves it.
+"""
+
+import threading
+from collections import deque
+
+from django.conf import settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (metric name, sample field, help text, unit divisor)
+SERIES = [
+    ("request_duration_seconds", "wall_ms", "Wall time per request", 1000),
+    ("request_db_seconds", "db_ms", "Time spent in SQL per request", 1000),
+    ("request_queries", "queries", "SQL queries per request", 1),
+    ("response_bytes", "size", "Response body size", 1),
+]
+
+_lock = threading.Lock()
+_views = {}
+
+
+class ViewStats:
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.over_budget = 0
+        self.sums = {field: 0 for _, field, _, _ in SERIES}
+
+    def add(self, sample, over_budget):
+        self.samples.append(sample)
+        self.count += 1
+        self.over_budget += over_budget
+        for field in self.sums:
+            self.sums[field] += sample[field]
+
+
+def window():
+    return getattr(settings, "METRICS_WINDOW", 1000)
+
+
+def budget_for(view_name):
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    return budgets.get(view_name, getattr(settings, "DEFAULT_QUERY_BUDGET", None))
+
+
+def record(view_name, wall_ms, db_ms, queries, size):
+    """Store one request; return the query budget it exceeded, or None."""
+    budget = budget_for(view_name)
+    over = budget is not None and queries > budget
+    sample = {"wall_ms": wall_ms, "db_ms": db_ms, "queries": queries, "size": size}
+    with _lock:
+        stats = _views.get(view_name)
+        if stats is None:
+            stats = _views[view_name] = ViewStats(window())
+        stats.add(sample, over)
+    return budget if over else None
+
+
+def reset():
+    with _lock:
+        _views.clear()
+
+
+def quantile(values, q):
+    """Nearest-rank quantile of an already sorted list."""
+    if not values:
+        return 0
+    index = min(len(values) - 1, max(0, round(q * len(values)) - 1))
+    return values[index]
+
+
+def snapshot():
+    """{view name: {"count", "over_budget", field: {"sum", quantile: value}}} for every view seen."""
+    with _lock:
+        views = {name: (list(stats.samples), stats.count, stats.over_budget, dict(stats.sums))
+                 for name, stats in _views.items()}
+    report = {}
+    for name, (samples, count, over_budget, sums) in sorted(views.items()):
+        entry = {"count": count, "over_budget": over_budget}
+        for _, field, _, _ in SERIES:
+            values = sorted(sample[field] for sample in samples)
+            entry[field] = {"sum": sums[field], **{q: quantile(values, q) for q in QUANTILES}}
+        report[name] = entry
+    return report
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(prefix="simats"):
+    """Render the snapshot in the Prometheus text exposition format."""
+    report = snapshot()
+    lines = []
+    for metric, field, help_text, divisor in SERIES:
+        name = f"{prefix}_{metric}"
+        lines.append(f"# HELP {name} {help_text} (quantiles over the last {window()} requests per view).")
+        lines.append(f"# TYPE {name} summary")
+        for view, entry in report.items():
+            label = f'view="{_escape(view)}"'
+            for q in QUANTILES:
+                lines.append(f'{name}{{{label},quantile="{q}"}} {entry[field][q] / divisor:g}')
+            lines.append(f"{name}_sum{{{label}}} {entry[field]['sum'] / divisor:g}")
+            lines.append(f"{name}_count{{{label}}} {entry['count']}")
+    name = f"{prefix}_query_budget_exceeded_total"
+    lines.append(f"# HELP {name} Requests that ran more SQL queries than QUERY_BUDGETS allows.")
+    lines.append(f"# TYPE {name} counter")
+    for view, entry in report.items():
+        lines.append(f'{name}{{view="{_escape(view)}"}} {entry["over_budget"]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,101 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# The QueryTimer of the request being served. Context variables follow each
+# request into the sync_to_async threads its ORM calls run in, so concurrent
+# async requests sharing one thread's connection still count only their own queries.
+_request_timer = ContextVar("request_timer", default=None)
+
+
+class QueryTimer:
+    """connection.execute_wrapper hook counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def count_query(execute, sql, params, many, context):
+    """The one execute wrapper on every connection: charges the query to the current request, if any."""
+    timer = _request_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install(sender, connection, **kwargs):
+    # First in the list: connection.execute_wrapper() blocks pop the last wrapper on exit
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+class MetricsMiddleware:
+    """Time every request and its SQL, and file the numbers under the URL name (see adminui.metrics)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened from now on get the wrapper from connection_created; these are already open
+        for connection in connections.all(initialized_only=True):
+            install(type(connection), connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        start = time.perf_counter()
+        token = _request_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_timer.reset(token)
+        self.record(request, response, timer, start)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        token = _request_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_timer.reset(token)
+        self.record(request, response, timer, start)
+        return response
+
+    def record(self, request, response, timer, start):
+        wall_ms = (time.perf_counter() - start) * 1000
+        match = request.resolver_match
+        view_name = (match.view_name or match._func_path) if match else "unresolved"
+        if response.streaming:
+            # Not consumed yet: size comes from the header, and queries run while streaming aren't counted
+            size = int(response.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+
+        budget = metrics.record(view_name, wall_ms, timer.seconds * 1000, timer.queries, size)
+        if budget is not None:
+            logger.warning("%s ran %d queries (budget %d): %s %s",
+                           view_name, timer.queries, budget, request.method, request.path)
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+COUNTED_MODELS = {
+    "student": ("student", "Student"),
+    "faculty": ("adminui", "Faculty"),
+    "problem": ("adminui", "Problem"),
+    "submission": ("student", "Submission"),
+}
+
+
+def seed_counts(apps, schema_editor):
+    EntityCount = apps.get_model("adminui", "EntityCount")
+    for name, (app_label, model_name) in COUNTED_MODELS.items():
+        total = apps.get_model(app_label, model_name).objects.count()
+        EntityCount.objects.update_or_create(name=name, defaults={"total": total})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminui', '0006_alter_faculty_username'),
+        ('student', '0016_alter_submission_faculty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('total', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def keep_existing_problems_unrestricted(apps, schema_editor):
+    # Problems created before per-problem limits accepted any file type and
+    # size; keep them that way (up to the site-wide cap) instead of silently
+    # applying the 25 MB / extension whitelist defaults meant for new problems.
+    Problem = apps.get_model("adminui", "Problem")
+    Problem.objects.update(max_upload_mb=settings.SUBMISSION_MAX_UPLOAD_MB, allowed_extensions="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminui', '0007_entitycount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='allowed_extensions',
+            field=models.CharField(blank=True, default='pdf,ppt,pptx,pptm,doc,docx,zip,png,jpg,jpeg', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='max_upload_mb',
+            field=models.PositiveIntegerField(default=25),
+        ),
+        migrations.RunPython(keep_existing_problems_unrestricted, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminui', '0008_problem_upload_limits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('problem', 'Problem'), ('cohort', 'Department / Year / Semester')], max_length=10)),
+                ('key', models.CharField(max_length=100)),
+                ('label', models.CharField(max_length=200)),
+                ('submitted', models.IntegerField(default=0)),
+                ('evaluated', models.IntegerField(default=0)),
+                ('marks_sum', models.BigIntegerField(default=0)),
+                ('possible_sum', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'key'), name='unique_grade_aggregate')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GradeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('aggregate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='adminui.gradeaggregate')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('aggregate', 'bucket'), name='unique_grade_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminui', '0009_grade_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entitycount',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
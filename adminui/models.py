@@ -23,6 +23,9 @@ class Problem(models.Model):
     description = models.TextField()
     total_marks = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)  # stores upload date automatically
+    # Upload limits for submissions; blank allowed_extensions accepts any type
+    max_upload_mb = models.PositiveIntegerField(default=25)
+    allowed_extensions = models.CharField(max_length=200, blank=True, default="pdf,ppt,pptx,pptm,doc,docx,zip,png,jpg,jpeg")
     created_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -31,7 +34,54 @@ class Problem(models.Model):
         related_name="uploaded_problems"
     )
 
+    def extension_list(self):
+        return [ext.strip().lower().lstrip(".") for ext in self.allowed_extensions.split(",") if ext.strip()]
+
     def __str__(self):
         return f"{self.title} (Uploaded by: {self.created_by.get_full_name() if self.created_by else 'Admin'})"
 
 
+
+class EntityCount(models.Model):
+    """Running total of rows per entity, kept current by adminui.signals."""
+    name = models.CharField(max_length=50, unique=True)
+    total = models.BigIntegerField(default=0)
+    version = models.BigIntegerField(default=0)  # bumped on shown changes (see adminui.signals); feeds page ETags
+
+    def __str__(self):
+        return f"{self.name}: {self.total}"
+
+
+class GradeAggregate(models.Model):
+    """Running grading totals for one problem or one cohort, kept current by adminui.analytics."""
+    PROBLEM = "problem"
+    COHORT = "cohort"
+    SCOPES = [(PROBLEM, "Problem"), (COHORT, "Department / Year / Semester")]
+
+    scope = models.CharField(max_length=10, choices=SCOPES)
+    key = models.CharField(max_length=100)  # problem id, or "department/year/semester"
+    label = models.CharField(max_length=200)
+    submitted = models.IntegerField(default=0)
+    evaluated = models.IntegerField(default=0)
+    marks_sum = models.BigIntegerField(default=0)
+    possible_sum = models.BigIntegerField(default=0)  # total_marks summed over evaluated submissions
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="unique_grade_aggregate"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.label}"
+
+
+class GradeBucket(models.Model):
+    """Histogram bar: evaluated submissions whose marks fall in one tenth of the total."""
+    aggregate = models.ForeignKey(GradeAggregate, on_delete=models.CASCADE, related_name="buckets")
+    bucket = models.PositiveSmallIntegerField()  # 0 = 0-9%, ..., 9 = 90-100%
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["aggregate", "bucket"], name="unique_grade_bucket"),
+        ]
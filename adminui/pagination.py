@@ -0,0 +1,120 @@
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a queryset ordered by ``keys`` descending.
+
+    Each page is fetched with a ``WHERE (k1, k2) < (last row)`` seek instead of
+    OFFSET, and no COUNT is issued, so page 1000 costs the same as page 1.
+    Cursors are signed so clients cannot forge arbitrary seek positions.
+
+    Works on ``values()`` querysets too (rows are dicts), as long as every key
+    is part of the projection.
+    """
+    salt = "adminui.pagination"
+
+    def __init__(self, queryset, per_page, keys=("submitted_at", "id")):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+
+    def get_page(self, cursor):
+        direction, values = self._decode(cursor)
+        rows = list(self._window(direction, values))
+        return self._page(rows, direction)
+
+    async def aget_page(self, cursor):
+        """get_page() for async views: the rows are fetched with async iteration."""
+        direction, values = self._decode(cursor)
+        rows = [row async for row in self._window(direction, values)]
+        return self._page(rows, direction)
+
+    def _window(self, direction, values):
+        queryset = self.queryset
+        if direction == "next":
+            queryset = queryset.filter(self._seek(values, "lt")).order_by(*["-" + key for key in self.keys])
+        elif direction == "prev":
+            queryset = queryset.filter(self._seek(values, "gt")).order_by(*self.keys)
+        else:
+            queryset = queryset.order_by(*["-" + key for key in self.keys])
+        return queryset[:self.per_page + 1]
+
+    def _page(self, rows, direction):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == "prev":
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, direction == "next"
+
+        return KeysetPage(
+            rows,
+            self._encode("next", rows[-1]) if rows and has_next else None,
+            self._encode("prev", rows[0]) if rows and has_previous else None,
+        )
+
+    def _seek(self, values, lookup):
+        # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y)
+        condition = Q()
+        for i, key in enumerate(self.keys):
+            term = Q(**{f"{key}__{lookup}": values[i]})
+            for prev_key, prev_value in zip(self.keys[:i], values[:i]):
+                term &= Q(**{prev_key: prev_value})
+            condition |= term
+        return condition
+
+    def _encode(self, direction, obj):
+        values = []
+        for key in self.keys:
+            value = obj[key] if isinstance(obj, dict) else getattr(obj, key)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return signing.dumps([direction, values], salt=self.salt)
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None, None
+        try:
+            direction, raw_values = signing.loads(cursor, salt=self.salt)
+            model = self.queryset.model
+            values = [model._meta.get_field(key).to_python(value) for key, value in zip(self.keys, raw_values)]
+        except (signing.BadSignature, ValidationError, ValueError, TypeError):
+            return None, None  # Unknown or tampered cursor: start from the first page
+        if direction not in ("next", "prev") or len(values) != len(self.keys):
+            return None, None
+        return direction, values
+
+
+async def apaginate(queryset, per_page, number):
+    """Paginator(queryset, per_page).get_page(number) for async views: acount() plus async iteration."""
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()  # fills the cached property so get_page() doesn't COUNT again
+    page = paginator.get_page(number)
+    page.object_list = [obj async for obj in page.object_list]
+    return page
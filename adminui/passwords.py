@@ -0,0 +1,84 @@
+"""
+Role-based password hashing.
+
+settings.PASSWORD_POLICY picks the algorithm and cost for each role, e.g.::
+
+    PASSWORD_POLICY = {"student": {"algorithm": "pbkdf2_sha256", "iterations": 600000}}
+
+Any key besides "algorithm" is set on the hasher (iterations, rounds,
+time_cost, ...). Hashes made under a different algorithm or a cheaper
+setting are upgraded on the next successful login; a hash that already costs
+more than the policy (say, one made with Django's default iterations before
+the policy was lowered) is left as it is rather than weakened. All hashing runs on a small shared thread pool
+(settings.PASSWORD_HASHING_WORKERS) so a burst of logins can only occupy
+that many CPU slots, whatever the number of request workers.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "PASSWORD_HASHING_WORKERS", 4),
+    thread_name_prefix="password-hash",
+)
+
+
+def get_role_hasher(role):
+    policy = dict(getattr(settings, "PASSWORD_POLICY", {}).get(role, {}))
+    base = get_hasher(policy.pop("algorithm", "default"))
+    if not policy:
+        return base
+    hasher = type(base)()
+    for name, value in policy.items():
+        setattr(hasher, name, value)
+    return hasher
+
+
+# Cost settings as they appear in a decoded hash (and, bar bcrypt's "rounds", on the hasher)
+_COST_KEYS = ("iterations", "work_factor", "time_cost", "memory_cost")
+
+
+def _costlier_than(encoded, hasher):
+    """True if ``encoded`` already uses ``hasher``'s algorithm with a higher cost than it."""
+    current = identify_hasher(encoded)
+    if current.algorithm != hasher.algorithm:
+        return False
+    decoded = current.decode(encoded)
+    for key in _COST_KEYS:
+        target = getattr(hasher, key, None)
+        if key == "work_factor" and target is None:
+            target = getattr(hasher, "rounds", None)
+        if key in decoded and target is not None and int(decoded[key]) > int(target):
+            return True
+    return False
+
+
+def _check(raw_password, encoded, hasher):
+    upgraded = []
+
+    def setter(raw):
+        if not _costlier_than(encoded, hasher):
+            upgraded.append(make_password(raw, hasher=hasher))
+
+    valid = check_password(raw_password, encoded, setter=setter, preferred=hasher)
+    return valid, (upgraded[0] if upgraded else None)
+
+
+def hash_password(role, raw_password):
+    hasher = get_role_hasher(role)
+    return _executor.submit(make_password, raw_password, None, hasher).result()
+
+
+def verify_password(role, raw_password, account):
+    """
+    Check ``raw_password`` against ``account.password``. On success, a hash
+    made under an older policy is replaced and saved.
+    """
+    hasher = get_role_hasher(role)
+    valid, upgraded = _executor.submit(_check, raw_password, account.password, hasher).result()
+    if valid and upgraded:
+        account.password = upgraded
+        account.save(update_fields=["password"])
+    return valid
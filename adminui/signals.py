@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from faculty.signals import submission_evaluated, submissions_evaluated
+from . import analytics, stats
+from .models import GradeAggregate
+
+
+# Fields no conditional page shows: saving only these (the password rehash on
+# login, a password reset) leaves the page ETags, and the counter row, alone
+UNLISTED_FIELDS = {"password"}
+
+
+def count_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        stats.bump(stats.count_name_for(sender), 1)
+    elif update_fields is None or not set(update_fields) <= UNLISTED_FIELDS:
+        stats.touch_on_commit(stats.count_name_for(sender))
+
+
+def count_deleted(sender, instance, **kwargs):
+    stats.bump(stats.count_name_for(sender), -1)
+
+
+for _label in stats.COUNTED_MODELS.values():
+    post_save.connect(count_saved, sender=_label, dispatch_uid=f"count_saved_{_label}")
+    post_delete.connect(count_deleted, sender=_label, dispatch_uid=f"count_deleted_{_label}")
+
+
+# ----- Grading analytics -----
+
+COHORT_FIELDS = ("department", "year", "semester")
+
+
+@receiver(post_save, sender="student.Submission")
+def submission_created(sender, instance, created, **kwargs):
+    if created:
+        analytics.submission_added(instance)
+
+
+# Deleting one of these cascades to its submissions; their pre_delete
+# receivers adjust the aggregates for all of them at once.
+CASCADING_MODELS = {"adminui.Problem", "student.Student"}
+
+
+def deleted_through(origin):
+    """Label of the model whose delete() started this deletion (``origin`` is an instance or a QuerySet)."""
+    if origin is None:
+        return None
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model._meta.label
+
+
+@receiver(post_delete, sender="student.Submission")
+def submission_deleted(sender, instance, origin=None, **kwargs):
+    if deleted_through(origin) not in CASCADING_MODELS:
+        analytics.submission_removed(instance)
+
+
+@receiver(pre_delete, sender="student.Student")
+def student_deleting(sender, instance, **kwargs):
+    analytics.submissions_removed(instance.submission_set.all())
+
+
+@receiver(submission_evaluated)
+def submission_graded(sender, submission, previous_marks, **kwargs):
+    analytics.marks_changed(submission, previous_marks)
+
+
+@receiver(submissions_evaluated)
+def submissions_graded(sender, changes, **kwargs):
+    analytics.marks_changed_many(changes)
+
+
+@receiver(pre_delete, sender="adminui.Problem")
+def problem_deleting(sender, instance, **kwargs):
+    # The problem's own aggregate goes entirely in problem_deleted
+    analytics.submissions_removed(instance.submissions.all(), scopes=[GradeAggregate.COHORT])
+
+
+@receiver(post_delete, sender="adminui.Problem")
+def problem_deleted(sender, instance, **kwargs):
+    analytics.forget_problem(instance.pk)
+
+
+@receiver(pre_save, sender="student.Student")
+def remember_cohort(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(COHORT_FIELDS)):
+        return
+    instance._previous_cohort = sender.objects.filter(pk=instance.pk).values_list(*COHORT_FIELDS).first()
+
+
+@receiver(post_save, sender="student.Student")
+def cohort_changed(sender, instance, **kwargs):
+    previous = instance.__dict__.pop("_previous_cohort", None)
+    current = tuple(getattr(instance, field) for field in COHORT_FIELDS)
+    if previous and previous != current:
+        analytics.rebuild_cohort(*previous)
+        analytics.rebuild_cohort(*current)
+
+
+# ----- Template fragments -----
+
+@receiver([post_save, post_delete], sender="adminui.Problem")
+def forget_problem_description(sender, instance, **kwargs):
+    # {% cache ... problem_description <problem id> %} in the student and faculty templates
+    cache.delete(make_template_fragment_key("problem_description", [instance.pk]))
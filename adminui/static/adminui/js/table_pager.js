@@ -0,0 +1,84 @@
+// Cursor paging for list tables: the « » links fetch one page from the JSON
+// API and swap only the <tbody>, instead of reloading the whole page.
+// Links keep their normal href, so a failed fetch just falls back to it.
+(function () {
+  function el(tag, attrs, children) {
+    const node = document.createElement(tag);
+    Object.entries(attrs || {}).forEach(([name, value]) => {
+      if (value !== null && value !== undefined && value !== false) node.setAttribute(name, value);
+    });
+    (children || []).forEach((child) => {
+      if (child === null || child === undefined || child === false) return;
+      node.append(child instanceof Node ? child : String(child));
+    });
+    return node;
+  }
+
+  // Django's |filesizeformat for the sizes we show
+  function fileSize(bytes) {
+    if (bytes < 1024) return bytes + " bytes";
+    const units = ["KB", "MB", "GB", "TB"];
+    let value = bytes / 1024;
+    let unit = 0;
+    while (value >= 1024 && unit < units.length - 1) { value /= 1024; unit++; }
+    return value.toFixed(1) + " " + units[unit];
+  }
+
+  // API datetimes are already in the server's time zone; show them like |date:"Y-m-d H:i"
+  function dateTime(iso) {
+    return iso ? iso.slice(0, 16).replace("T", " ") : "";
+  }
+
+  // Reverse a "{% url 'name' 0 %}" template for a given id
+  function urlFor(template, id) {
+    return template.replace("/0/", "/" + id + "/");
+  }
+
+  function attach(options) {
+    const tbody = options.table.tBodies[0];
+    const list = options.nav.querySelector("ul");
+    const linkClass = (list.querySelector("a[data-cursor]") || {}).className || "page-link";
+    const params = options.params || {};
+
+    function pageHref(cursor) {
+      const query = new URLSearchParams(params);
+      query.set("cursor", cursor);
+      return "?" + query;
+    }
+
+    function pageLink(cursor, label) {
+      return el("li", {class: "page-item"}, [
+        el("a", {class: linkClass, href: pageHref(cursor), "data-cursor": cursor}, [label]),
+      ]);
+    }
+
+    function load(cursor) {
+      const query = new URLSearchParams(params);
+      query.set("fields", options.fields.join(","));
+      query.set("cursor", cursor);
+      return fetch(options.url + "?" + query, {credentials: "same-origin", headers: {Accept: "application/json"}})
+        .then((response) => {
+          if (!response.ok) throw new Error(response.status);
+          return response.json();
+        })
+        .then((data) => {
+          const rows = data.results.map(options.render);
+          tbody.replaceChildren(...(rows.length ? rows : [options.empty()]));
+          list.replaceChildren(...[
+            data.previous && pageLink(data.previous, "«"),
+            data.next && pageLink(data.next, "»"),
+          ].filter(Boolean));
+          history.replaceState(null, "", pageHref(cursor));
+        });
+    }
+
+    options.nav.addEventListener("click", (event) => {
+      const link = event.target.closest("a[data-cursor]");
+      if (!link) return;
+      event.preventDefault();
+      load(link.dataset.cursor).catch(() => { window.location.href = link.href; });
+    });
+  }
+
+  window.TablePager = {attach, el, fileSize, dateTime, urlFor};
+})();
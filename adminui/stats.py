@@ -0,0 +1,79 @@
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+
+from .models import EntityCount
+
+# Entity name -> model whose rows are counted
+COUNTED_MODELS = {
+    "student": "student.Student",
+    "faculty": "adminui.Faculty",
+    "problem": "adminui.Problem",
+    "submission": "student.Submission",
+}
+
+
+def count_name_for(model):
+    for name, label in COUNTED_MODELS.items():
+        if model._meta.label == label:
+            return name
+    return None
+
+
+def bump(name, delta):
+    """Add ``delta`` to the total and mark the entity as changed."""
+    updated = EntityCount.objects.filter(name=name).update(total=F("total") + delta, version=F("version") + 1)
+    if not updated:
+        # Row missing (fresh table or manual cleanup): seed it from a real count once
+        rebuild([name])
+
+
+def touch(name):
+    """Mark the entity as changed without a row being added or removed (edits, bulk updates)."""
+    bump(name, 0)
+
+
+def touch_on_commit(name):
+    """
+    touch() once the surrounding transaction commits. Every writer of an
+    entity shares its counter row; this way the row is locked only for its
+    own UPDATE, not for the rest of the caller's transaction.
+    """
+    transaction.on_commit(lambda: touch(name))
+
+
+def get_versions():
+    """Return {entity name: change counter} with a single indexed read."""
+    return dict(EntityCount.objects.values_list("name", "version"))
+
+
+def get_counts():
+    """Return {entity name: total} with a single indexed read."""
+    counts = dict(EntityCount.objects.values_list("name", "total"))
+    missing = [name for name in COUNTED_MODELS if name not in counts]
+    if missing:
+        counts.update(rebuild(missing))
+    return counts
+
+
+async def aget_counts():
+    """get_counts() for async views."""
+    counts = {name: total async for name, total in EntityCount.objects.values_list("name", "total")}
+    missing = [name for name in COUNTED_MODELS if name not in counts]
+    if missing:
+        counts.update(await sync_to_async(rebuild)(missing))
+    return counts
+
+
+def rebuild(names=None):
+    """Recount the given entities (all by default) and store the totals."""
+    totals = {}
+    for name in names or COUNTED_MODELS:
+        model = apps.get_model(COUNTED_MODELS[name])
+        totals[name] = model.objects.count()
+        EntityCount.objects.update_or_create(
+            name=name, defaults={"total": totals[name], "version": F("version") + 1},
+            create_defaults={"total": totals[name]},
+        )
+    return totals
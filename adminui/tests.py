@@ -1,3 +1,476 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from adminui import analytics, api, benchmarking, bulk_import, exports, metrics, stats
+from adminui.middleware import count_query
+from adminui.models import EntityCount, Faculty, GradeAggregate, Problem
+from adminui.pagination import KeysetPaginator, apaginate
+from student.models import Student, Submission
+
+
+FAST_HASHING = {"student": {"algorithm": "md5"}, "faculty": {"algorithm": "md5"}}
+
+
+class AdminTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", password="pw", is_staff=True)
+        self.client.force_login(self.admin)
+
+
+def make_student(student_id="S1", **fields):
+    values = {"full_name": f"Student {student_id}", "password": "x", "gender": "other", "year": 1, "semester": 1,
+              "department": "CSE", **fields}
+    return Student.objects.create(student_id=student_id, **values)
+
+
+# ----- Entity counters -----
+
+class EntityCountTests(TestCase):
+    def row(self, name):
+        return EntityCount.objects.values_list("total", "version").get(name=name)
+
+    def test_saves_and_deletes_keep_totals(self):
+        stats.get_counts()  # seed every row
+        total, version = self.row("student")
+        student = make_student()
+        self.assertEqual(self.row("student")[0], total + 1)
+        student.delete()
+        total_after, version_after = self.row("student")
+        self.assertEqual(total_after, total)
+        self.assertGreater(version_after, version)
+
+    def test_touch_changes_version_only(self):
+        stats.get_counts()
+        total, version = self.row("problem")
+        stats.touch("problem")
+        self.assertEqual(self.row("problem"), (total, version + 1))
+
+    def test_missing_rows_are_seeded_from_a_real_count(self):
+        make_student()
+        make_student("S2")
+        EntityCount.objects.all().delete()
+        self.assertEqual(stats.get_counts()["student"], 2)
+        EntityCount.objects.filter(name="student").delete()
+        stats.bump("student", 1)  # no row to update: recounted instead of starting from 1
+        self.assertEqual(self.row("student")[0], 2)
+
+    async def test_async_counts_match(self):
+        await Student.objects.acreate(student_id="S1", full_name="A", password="x", gender="other", year=1,
+                                      semester=1, department="CSE")
+        self.assertEqual(await stats.aget_counts(), await sync_to_async(stats.get_counts)())
+
+
+# ----- Conditional GET -----
+
+class ConditionalPageTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = make_student()
+
+    def etag(self, url):
+        self.client.get(url)  # sets the CSRF cookie and seeds the counters, both part of the ETag
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_page_is_not_modified(self):
+        etag = self.etag("/students/")
+        self.assertEqual(self.revalidate("/students/", etag), 304)
+
+    def test_pending_messages_are_rendered(self):
+        etag = self.etag("/students/")
+        self.client.post(f"/students/{self.student.pk}/change-password/",
+                         {"new_password": "a", "confirm_password": "b"})
+        response = self.client.get("/students/", HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Passwords do not match!")
+
+    def test_problem_save_changes_the_dashboard(self):
+        problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        etag = self.etag("/dashboard/")
+        problem.title = "P1 renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            problem.save()
+        self.assertEqual(self.revalidate("/dashboard/", etag), 200)
+
+    def test_password_only_save_leaves_pages_and_counter_alone(self):
+        etag = self.etag("/students/")
+        version = stats.get_versions()["student"]
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.student.password = "y"
+            self.student.save(update_fields=["password"])
+        self.assertEqual(callbacks, [])
+        self.assertEqual(stats.get_versions()["student"], version)
+        self.assertEqual(self.revalidate("/students/", etag), 304)
+
+    def test_edit_touches_the_counter_after_commit(self):
+        stats.get_counts()
+        version = stats.get_versions()["student"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.full_name = "Renamed"
+            self.student.save()
+            self.assertEqual(stats.get_versions()["student"], version)  # not locked for the transaction
+        self.assertEqual(stats.get_versions()["student"], version + 1)
+
+
+# ----- Pagination -----
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        now = timezone.now()
+        for i in range(7):
+            submission = Submission.objects.create(problem=problem, student=make_student(f"S{i}"),
+                                                   file=f"submissions/{i}")
+            # Pairs share a timestamp so the id has to break the tie
+            Submission.objects.filter(pk=submission.pk).update(submitted_at=now - timedelta(minutes=i // 2))
+        self.expected = list(Submission.objects.order_by("-submitted_at", "-id").values_list("id", flat=True))
+        self.paginator = KeysetPaginator(Submission.objects.all(), 3)
+
+    def ids(self, page):
+        return [submission.id for submission in page]
+
+    def test_next_and_previous_round_trip(self):
+        first = self.paginator.get_page(None)
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), self.expected)
+        self.assertFalse(first.has_previous())
+        self.assertFalse(third.has_next())
+
+        back = self.paginator.get_page(third.previous_cursor)
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertEqual(self.ids(self.paginator.get_page(back.previous_cursor)), self.ids(first))
+
+    def test_ties_on_submitted_at_are_broken_by_id(self):
+        seen = []
+        page = self.paginator.get_page(None)
+        while True:
+            seen.extend(self.ids(page))
+            if not page.has_next():
+                break
+            page = self.paginator.get_page(page.next_cursor)
+        self.assertEqual(seen, self.expected)  # nothing skipped or repeated at the tied boundaries
+
+    def test_tampered_or_truncated_cursor_starts_over(self):
+        cursor = self.paginator.get_page(None).next_cursor
+        for bad in (cursor[:-3], cursor[:10], cursor.replace(cursor[5], "x" if cursor[5] != "x" else "y"), "junk"):
+            with self.subTest(cursor=bad):
+                self.assertEqual(self.ids(self.paginator.get_page(bad)), self.expected[:3])
+
+    def test_cursor_for_other_keys_is_rejected(self):
+        cursor = KeysetPaginator(Submission.objects.all(), 3, keys=("id",)).get_page(None).next_cursor
+        self.assertEqual(self.ids(self.paginator.get_page(cursor)), self.expected[:3])
+
+    async def test_async_page_matches(self):
+        first = await self.paginator.aget_page(None)
+        second = await self.paginator.aget_page(first.next_cursor)
+        self.assertEqual(self.ids(first) + self.ids(second), self.expected[:6])
+
+    async def test_apaginate_counts_once(self):
+        queryset = Submission.objects.order_by("-submitted_at", "-id")
+        page = await apaginate(queryset, 3, "3")
+        self.assertEqual((page.number, page.paginator.num_pages), (3, 3))
+        self.assertEqual([s.id for s in page.object_list], self.expected[6:])
+        page = await apaginate(queryset, 3, "nonsense")
+        self.assertEqual(page.number, 1)
+
+
+# ----- Production profile and dashboard benchmark -----
+
+@override_settings(PASSWORD_POLICY=FAST_HASHING, PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class DashboardBenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        benchmarking.seed(students=6, problems=2, faculty=1, submissions_per_student=1)
+
+    def test_seeded_dashboards_load_for_every_role(self):
+        for client, url in ((benchmarking.admin_client(), "/dashboard/"),
+                            (benchmarking.faculty_client(), "/faculty/dashboard/"),
+                            (benchmarking.student_client(), "/student/student/")):
+            with self.subTest(url=url):
+                self.assertEqual(len(benchmarking.time_requests(client, url, 2)), 2)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db")
+    def test_cached_db_sessions_skip_the_session_table(self):
+        client = benchmarking.student_client()
+        client.get("/student/student/")
+        with CaptureQueriesContext(connection) as queries:
+            client.get("/student/student/")
+        self.assertFalse([q for q in queries if "django_session" in q["sql"]])
+
+    def test_summary(self):
+        summary = benchmarking.summarize([0.001, 0.002, 0.003, 0.010], wall_time=0.02)
+        self.assertEqual((summary["requests"], summary["rps"]), (4, 200.0))
+        self.assertEqual((summary["p50_ms"], summary["p99_ms"]), (2.0, 10.0))
+
+
+@override_settings(PASSWORD_POLICY=FAST_HASHING, PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class FlowRecorderTests(TestCase):
+    def test_steps_record_latency_queries_and_errors(self):
+        benchmarking.seed(students=2, problems=1, faculty=1, submissions_per_student=0)
+        recorder = benchmarking.FlowRecorder()
+        client = Client()
+        for password in ("wrong", benchmarking.PASSWORD):
+            recorder.request("student_login", client.post, "/student/auth/", {
+                "form_type": "login", "student_id": "BENCH000000", "password": password,
+            }, expect=(302,))
+        recorder.request("student_dashboard", client.get, "/student/student/")
+
+        report = recorder.report({"student_login": 0.5})
+        self.assertEqual((report["student_login"]["requests"], report["student_login"]["errors"]), (2, 1))
+        self.assertEqual(report["student_login"]["rps"], 4.0)  # two requests in the 0.5 s phase
+        self.assertEqual(report["student_dashboard"]["errors"], 0)
+        self.assertGreater(report["student_dashboard"]["queries_per_request"], 0)
+        self.assertEqual(report["student_dashboard"]["max_queries"],
+                         report["student_dashboard"]["queries_per_request"])
+
+    def test_run_concurrently_runs_every_job(self):
+        done = []
+        wall = benchmarking.run_concurrently(done.append, range(5))
+        self.assertEqual(sorted(done), list(range(5)))
+        self.assertGreater(wall, 0)
+
+
+# ----- Problem upload -----
+
+@override_settings(SUBMISSION_MAX_UPLOAD_MB=100)
+class ProblemUploadTests(AdminTestCase):
+    def upload(self, max_upload_mb):
+        return self.client.post("/problem/upload/", {
+            "title": "P1", "description": "d", "total_marks": "10", "max_upload_mb": max_upload_mb,
+        }, follow=True)
+
+    def test_valid_limit_is_stored(self):
+        self.upload("40")
+        self.assertEqual(Problem.objects.get().max_upload_mb, 40)
+
+    def test_blank_limit_uses_default(self):
+        self.upload("")
+        self.assertEqual(Problem.objects.get().max_upload_mb, 25)
+
+    def test_bad_limits_are_reported(self):
+        for value in ("abc", "0", "-5", "2.5", "101"):
+            with self.subTest(value=value):
+                response = self.upload(value)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "Max file size must be")
+        self.assertFalse(Problem.objects.exists())
+
+
+# ----- Bulk import -----
+
+STUDENT_HEADER = "full_name,student_id,password,gender,year,semester,department\n"
+
+
+@override_settings(PASSWORD_POLICY=FAST_HASHING, PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class BulkImportTests(TestCase):
+    def test_overlong_cells_are_row_errors(self):
+        lines = [
+            STUDENT_HEADER,
+            "Ann,S1,pw,female,1,1,CSE\n",
+            f"{'x' * 101},S2,pw,male,1,1,CSE\n",
+            f"Bob,{'9' * 51},pw,male,1,1,CSE\n",
+            f"Cy,S4,pw,male,1,1,{'D' * 51}\n",
+        ]
+        report = bulk_import.import_csv("student", lines, workers=1)
+        self.assertEqual(report.created, 1)
+        self.assertEqual([line for line, _ in report.errors], [3, 4, 5])
+        self.assertIn("full_name is longer than 100 characters", report.errors[0][1])
+        self.assertEqual(list(Student.objects.values_list("student_id", flat=True)), ["S1"])
+
+    @override_settings(BULK_IMPORT_WORKERS=2)
+    def test_pool_is_capped_by_setting(self):
+        with mock.patch.object(bulk_import, "ProcessPoolExecutor", wraps=bulk_import.ProcessPoolExecutor) as pool:
+            bulk_import.import_csv("student", [STUDENT_HEADER, "Ann,S1,pw,female,1,1,CSE\n"])
+        self.assertEqual(pool.call_args.kwargs["max_workers"], 2)
+
+
+# ----- Marks export -----
+
+class ExportTests(TestCase):
+    def test_formula_like_text_is_escaped(self):
+        problem = Problem.objects.create(title="=HYPERLINK(\"http://x\")", description="d", total_marks=10)
+        student = Student.objects.create(full_name="@SUM(A1)", student_id="S1", password="x", gender="other",
+                                         year=1, semester=1, department="-CSE")
+        Submission.objects.create(problem=problem, student=student, file="submissions/a.pdf",
+                                  faculty_marks=5, faculty_remarks="+1 well done")
+        row = next(exports.export_rows({}))
+        self.assertEqual(row[:3], ("S1", "'@SUM(A1)", "'-CSE"))
+        self.assertEqual(row[5], "'=HYPERLINK(\"http://x\")")
+        self.assertEqual(row[7:9], (5, "'+1 well done"))
+
+    def test_rows_are_fetched_in_bounded_pages(self):
+        problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        submitted_at = timezone.now()
+        for n in range(5):
+            Submission.objects.create(problem=problem, student=make_student(f"S{n}"), file=f"submissions/{n}.pdf")
+        Submission.objects.update(submitted_at=submitted_at)  # ties are broken by id
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(exports.export_rows({"problem_id": problem.pk}, chunk_size=2))
+        self.assertEqual([row[0] for row in rows], [f"S{n}" for n in range(5)])
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(all("LIMIT 2" in query["sql"] for query in queries))
+
+
+# ----- JSON API -----
+
+class ApiTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        self.students = [make_student(f"201AU{n:03d}") for n in range(5)]
+
+    def get(self, resource, **params):
+        return self.client.get(f"/api/{resource}/", params)
+
+    def test_requested_fields_only(self):
+        response = self.get("students", fields="student_id,year", limit="2")
+        self.assertEqual(response.json()["results"], [{"student_id": "201AU004", "year": 1},
+                                                      {"student_id": "201AU003", "year": 1}])
+        self.assertEqual(self.get("students", fields="password").status_code, 400)
+
+        Problem.objects.create(title="P1", description="long text", total_marks=10)
+        self.assertNotIn("description", self.get("problems").json()["results"][0])
+        self.assertEqual(self.get("problems", fields="description").json()["results"], [{"description": "long text"}])
+
+    def test_cursors_page_through_every_search_match_by_id(self):
+        make_student("201AU")  # ranked first by the HTML search, listed by id here
+        seen, cursor = [], ""
+        while True:
+            data = api.page("students", {"q": "201au", "fields": "id", "limit": "2", "cursor": cursor})
+            seen += [row["id"] for row in data["results"]]
+            if not data["next"]:
+                break
+            cursor = data["next"]
+        self.assertEqual(seen, sorted(Student.objects.values_list("id", flat=True), reverse=True))
+
+    def test_access_by_role(self):
+        self.assertEqual(self.get("students").status_code, 200)
+        self.assertEqual(self.get("nothing").status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.get("problems").status_code, 403)
+
+        faculty = Faculty.objects.create(username="fac", password="x", faculty_id="FAC1", gender="other",
+                                         department="CSE")
+        session = self.client.session
+        session["faculty_id"] = faculty.faculty_id
+        session.save()
+        self.assertEqual(self.get("problems").status_code, 200)
+        self.assertEqual(self.get("students").status_code, 403)
+
+
+# ----- Grading analytics -----
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+
+    def submissions(self, count, start=0):
+        result = []
+        for i in range(start, start + count):
+            student = Student.objects.create(full_name=f"S{i}", student_id=f"S{i}", password="x", gender="other",
+                                             year=1 + i % 2, semester=1, department="CSE")
+            result.append(Submission.objects.create(problem=self.problem, student=student, file=f"submissions/{i}"))
+        return result
+
+    def grade(self, submissions, marks):
+        changes = []
+        for submission, value in zip(submissions, marks):
+            changes.append((submission, submission.faculty_marks))
+            submission.faculty_marks = value
+        Submission.objects.bulk_update(submissions, ["faculty_marks"])
+        with CaptureQueriesContext(connection) as queries:
+            analytics.marks_changed_many(changes)
+        return len(queries)
+
+    def snapshot(self):
+        return {scope: analytics.report(scope) for scope, _ in GradeAggregate.SCOPES}
+
+    def test_batch_matches_rebuild(self):
+        batch = self.submissions(6)
+        self.grade(batch, [0, 3, 10, 7, 7, None])
+        self.grade(batch[:3], [5, 3, 1])  # regrades, one unchanged
+        incremental = self.snapshot()
+        analytics.rebuild()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        small = self.grade(self.submissions(2), [4, 8])
+        large = self.grade(self.submissions(20, start=2), [i % 11 for i in range(20)])
+        self.assertEqual(large, small)
+
+    def test_cascaded_deletes_match_rebuild(self):
+        batch = self.submissions(6)
+        self.grade(batch, [0, 3, 10, 7, 7, None])
+        other = Problem.objects.create(title="P2", description="d", total_marks=20)
+        extra = [Submission.objects.create(problem=other, student=s.student, file=f"submissions/x{s.pk}")
+                 for s in batch[:4]]
+        self.grade(extra, [20, 15, None, 1])
+
+        batch[0].student.delete()
+        other.delete()
+        incremental = self.snapshot()
+        analytics.rebuild()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_cascaded_delete_updates_aggregates_in_constant_queries(self):
+        def analytics_queries(student):
+            with CaptureQueriesContext(connection) as queries:
+                student.delete()
+            return len([q for q in queries if "adminui_grade" in q["sql"]])
+
+        few, many = self.submissions(2)
+        self.grade([few], [4])
+        for n in range(5):
+            problem = Problem.objects.create(title=f"Q{n}", description="d", total_marks=10)
+            self.grade([Submission.objects.create(problem=problem, student=many.student, file=f"submissions/q{n}")],
+                       [n])
+        self.assertEqual(analytics_queries(many.student), analytics_queries(few.student))
+
+
+# ----- Request metrics -----
+
+class MetricsMiddlewareTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def queries(self, view_name):
+        return [sample["queries"] for sample in metrics._views[view_name].samples]
+
+    def test_sync_request_is_counted(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/students/")
+        self.assertEqual(self.queries("student_list"), [len(queries)])
+
+    async def test_concurrent_async_requests_count_only_their_own_queries(self):
+        client = AsyncClient()
+        await client.aforce_login(self.admin)
+        await client.get("/faculty/")  # warm up: the first request also seeds the counters
+        metrics.reset()
+        await client.get("/faculty/")
+        [alone] = self.queries("faculty_list")
+
+        responses = await asyncio.gather(*(client.get("/faculty/") for _ in range(5)))
+        self.assertEqual([response.status_code for response in responses], [200] * 5)
+        self.assertEqual(self.queries("faculty_list"), [alone] * 6)
+        self.assertEqual(metrics.snapshot()["faculty_list"]["over_budget"], 0)
+
+    def test_wrapper_survives_other_execute_wrappers(self):
+        self.client.get("/students/")
+        with connection.execute_wrapper(lambda execute, *args: execute(*args)):
+            pass
+        self.assertIn(count_query, connection.execute_wrappers)
@@ -11,6 +11,11 @@ urlpatterns = [
     path("faculty/edit/<int:pk>/", views.edit_faculty, name="edit_faculty"),
     path("faculty/delete/<int:pk>/", views.delete_faculty, name="delete_faculty"),
     path('problem/upload/', views.problem_upload, name='problem_upload'),
+    path("metrics/", views.metrics_view, name="metrics"),
+    path("analytics/", views.analytics_view, name="analytics"),
+    path("export/marks/", views.export_marks, name="export_marks"),
+    path("import/", views.bulk_import, name="bulk_import"),
+    path("api/<str:resource>/", views.api_list, name="api_list"),
     path("students/", views.student_list, name="student_list"),
     path("students/<int:student_id>/change-password/", views.student_change_password, name="student_change_password"),
     path('problem/delete/<int:pk>/', views.delete_problem, name='delete_problem'),
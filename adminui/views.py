@@ -4,10 +4,11 @@ from django.contrib.auth import authenticate, login, logout
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
 from student.models import Student, Submission
+from faculty.middleware import forget_faculty
 from adminui.models import Problem, Faculty
 from datetime import datetime
 from django.views.decorators.cache import never_cache
-from django.contrib.auth.hashers import make_password
+from adminui.passwords import hash_password
 
 # ----- Admin Access Decorator -----
 def admin_required(view_func):
@@ -65,49 +66,52 @@ from django.views.decorators.cache import never_cache
 from .decorators import admin_required
 from student.models import Student, Submission
 from adminui.models import Faculty, Problem
+from adminui import analytics, exports, metrics, stats
+from adminui.models import GradeAggregate
+from adminui.pagination import KeysetPaginator
+from adminui.conditional import conditional_page
+from asgiref.sync import sync_to_async
+from student.search import asearch_students
 
 @admin_required
-@never_cache
-def dashboard(request):
-    student_count = Student.objects.count()
-    faculty_count = Faculty.objects.count()
-    problem_count = Problem.objects.count()
-
-    submissions = Submission.objects.select_related("student", "faculty", "problem").order_by("-submitted_at")
-    paginator = Paginator(submissions, 8)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+@conditional_page("student", "faculty", "problem", "submission")
+async def dashboard(request):
+    counts = await stats.aget_counts()
+
+    submissions = Submission.objects.select_related("student", "faculty", "problem__created_by")
+    paginator = KeysetPaginator(submissions, 8)
+    page_obj = await paginator.aget_page(request.GET.get("cursor"))
 
     context = {
-        "student_count": student_count,
-        "faculty_count": faculty_count,
-        "problem_count": problem_count,
+        "student_count": counts["student"],
+        "faculty_count": counts["faculty"],
+        "problem_count": counts["problem"],
         "page_obj": page_obj,
+        "problems": [p async for p in Problem.objects.order_by("-created_at").only("id", "title")],
+        "export_formats": exports.FORMATS,
     }
 
-    response = render(request, "adminui/dashboard.html", context)
-    # Add no-cache headers
-    response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response['Pragma'] = 'no-cache'
-    response['Expires'] = '0'
-    return response
+    # Rendering reads request.user, the session and messages, which are sync-only
+    return await sync_to_async(render)(request, "adminui/dashboard.html", context)
 
 
 # ----- Student List -----
 @admin_required
-@never_cache
-def student_list(request):
+@conditional_page("student")
+async def student_list(request):
     query = request.GET.get("q", "")
     if query:
-        students = Student.objects.filter(full_name__icontains=query) | Student.objects.filter(student_id__icontains=query)
+        # Ranked prefix search over the indexed terms, capped at search.MAX_RESULTS
+        ranked_ids = await asearch_students(query)
+        found = await Student.objects.ain_bulk(ranked_ids)
+        students = [found[pk] for pk in ranked_ids if pk in found]
+        page_obj = Paginator(students, 12).get_page(request.GET.get("page"))
     else:
-        students = Student.objects.all()
-
-    paginator = Paginator(students, 12)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+        # Plain browsing pages by cursor so the table can also be paged through /api/students/
+        students = Student.objects.only("id", "student_id", "full_name")
+        page_obj = await KeysetPaginator(students, 12, keys=("id",)).aget_page(request.GET.get("cursor"))
 
-    return render(request, "adminui/student_list.html", {
+    return await sync_to_async(render)(request, "adminui/student_list.html", {
         "page_obj": page_obj,
         "query": query
     })
@@ -126,29 +130,28 @@ def student_change_password(request, student_id):
             messages.error(request, "Passwords do not match!")
         else:
             student.set_password(new_password)
-            student.save()
+            student.save(update_fields=["password"])
             messages.success(request, f"Password updated for {student.full_name}")
 
     return redirect("student_list")
 
 # ----- Faculty CRUD -----
 @admin_required
-@never_cache
-def faculty_list(request):
+@conditional_page("faculty")
+async def faculty_list(request):
     search_query = request.GET.get("search", "")
     faculties = Faculty.objects.all()
     if search_query:
         faculties = faculties.filter(faculty_id__icontains=search_query)
 
-    paginator = Paginator(faculties, 7)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(faculties, 7, keys=("id",))
+    page_obj = await paginator.aget_page(request.GET.get("cursor"))
 
     context = {
         "page_obj": page_obj,
         "search": search_query,
     }
-    return render(request, "adminui/faculty_list.html", context)
+    return await sync_to_async(render)(request, "adminui/faculty_list.html", context)
 
 @admin_required
 @never_cache
@@ -171,7 +174,7 @@ def add_faculty(request):
 
         Faculty.objects.create(
             username=username,
-            password=make_password(password),
+            password=hash_password("faculty", password),
             faculty_id=faculty_id,
             gender=gender,
             department=department
@@ -199,13 +202,15 @@ def edit_faculty(request, pk):
             messages.error(request, "Faculty ID already exists.")
             return redirect("faculty_list")
 
+        if faculty.faculty_id != faculty_id:
+            forget_faculty(faculty.faculty_id)  # drop the identity cached under the old ID
         faculty.username = username
         faculty.faculty_id = faculty_id
         faculty.gender = gender
         faculty.department = department
 
         if password:
-            faculty.password = make_password(password)
+            faculty.password = hash_password("faculty", password)
 
         faculty.save()
         messages.success(request, "Faculty updated successfully.")
@@ -222,6 +227,109 @@ def delete_faculty(request, pk):
     messages.success(request, "Faculty deleted successfully.")
     return redirect("faculty_list")
 
+# ----- Request metrics -----
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+@admin_required
+@never_cache
+def metrics_view(request):
+    return HttpResponse(metrics.prometheus_text(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+# ----- Grading analytics -----
+@admin_required
+@never_cache
+def analytics_view(request):
+    context = {
+        "problem_rows": analytics.report(GradeAggregate.PROBLEM),
+        "cohort_rows": analytics.report(GradeAggregate.COHORT),
+        "bucket_labels": [f"{10 * i}%" for i in range(analytics.BUCKETS)],
+    }
+    return render(request, "adminui/analytics.html", context)
+
+# ----- Bulk import -----
+
+import io
+from adminui.bulk_import import ROLES, import_csv
+
+@admin_required
+@never_cache
+def bulk_import(request):
+    report = None
+    role = request.POST.get("role", "student")
+    if request.method == "POST":
+        upload = request.FILES.get("file")
+        if role not in ROLES or not upload:
+            messages.error(request, "Choose a role and a CSV file.")
+            return redirect("bulk_import")
+
+        # utf-8-sig drops the BOM spreadsheet exports put in front of the header
+        report = import_csv(role, io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""))
+        if report.created:
+            messages.success(request, f"Imported {report.created} {role} account(s).")
+        if report.errors:
+            messages.warning(request, f"{report.rejected} row(s) were rejected.")
+
+    context = {
+        "report": report,
+        "role": role,
+        "columns": {name: spec["columns"] for name, spec in ROLES.items()},
+    }
+    return render(request, "adminui/bulk_import.html", context)
+
+# ----- Marks export -----
+
+import tempfile
+
+@admin_required
+@never_cache
+def export_marks(request):
+    export_format = request.GET.get("format", "csv")
+    try:
+        if export_format not in exports.FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        filters = exports.parse_filters(request.GET)
+    except ValueError as exc:
+        messages.error(request, str(exc))
+        return redirect("dashboard")
+
+    rows = exports.export_rows(filters)
+    name = exports.filename(filters, export_format)
+    if export_format == "xlsx":
+        # A zip container can't be streamed; build it in a temp file instead of memory
+        fh = tempfile.TemporaryFile()
+        exports.write_xlsx(rows, fh)
+        fh.seek(0)
+        return FileResponse(fh, as_attachment=True, filename=name,
+                            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    response = StreamingHttpResponse(exports.csv_lines(rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{name}"'
+    return response
+
+# ----- JSON API -----
+
+from django.http import JsonResponse
+from adminui import api
+
+@never_cache
+async def api_list(request, resource):
+    spec = api.RESOURCES.get(resource)
+    if spec is None:
+        return JsonResponse({"error": f"Unknown resource: {resource}"}, status=404)
+
+    user = await request.auser()
+    is_staff = user.is_authenticated and user.is_staff
+    is_faculty = bool(await request.afaculty())
+    if not ((is_staff and api.STAFF in spec["access"]) or (is_faculty and api.FACULTY in spec["access"])):
+        return JsonResponse({"error": "Not allowed"}, status=403)
+
+    try:
+        data = await api.apage(resource, request.GET)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse(data)
+
 # ----- Problem CRUD -----
 
 
@@ -229,26 +337,40 @@ from datetime import datetime, timedelta
 from django.shortcuts import render, redirect
 from django.core.paginator import Paginator
 from django.contrib import messages
+from django.conf import settings
 from django.views.decorators.cache import never_cache
 from .models import Problem
 from .decorators import admin_required
 
 @admin_required
-@never_cache
+@conditional_page("problem", extra=lambda request: datetime.now().strftime("%Y-%m-%d %H:%M"))  # the page shows the time
 def problem_upload(request):
+    upload_limit = settings.SUBMISSION_MAX_UPLOAD_MB
     if request.method == "POST":
         title = request.POST.get("title")
         description = request.POST.get("description")
         total_marks = request.POST.get("total_marks")
+        max_upload_mb = request.POST.get("max_upload_mb", "").strip() or "25"
+        allowed_extensions = request.POST.get("allowed_extensions", "").strip()
 
         if not title or not description or not total_marks:
             messages.error(request, "All fields are required!")
             return redirect('problem_upload')
 
+        try:
+            max_upload_mb = int(max_upload_mb)
+        except ValueError:
+            max_upload_mb = 0
+        if not 1 <= max_upload_mb <= upload_limit:
+            messages.error(request, f"Max file size must be a whole number of MB between 1 and {upload_limit}.")
+            return redirect('problem_upload')
+
         Problem.objects.create(
             title=title,
             description=description,
             total_marks=total_marks,
+            max_upload_mb=max_upload_mb,
+            allowed_extensions=allowed_extensions,
             created_by=request.user  # optional: store the uploader
         )
         messages.success(request, "Problem uploaded successfully!")
@@ -275,7 +397,8 @@ def problem_upload(request):
         'problems': page_obj,
         'today': datetime.today().strftime('%Y-%m-%d'),  # matches <input type="date">
         'now_time': datetime.now().strftime('%I:%M %p'),
-        'selected_date': selected_date
+        'selected_date': selected_date,
+        'max_upload_mb_limit': upload_limit,
     }
     return render(request, "adminui/problem_upload.html", context)
 
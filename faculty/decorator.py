@@ -1,12 +1,24 @@
+from functools import wraps
+
 from django.shortcuts import redirect
+from asgiref.sync import iscoroutinefunction
 
 def faculty_login_required(view_func):
     """
-    Redirects to faculty login if not logged in.
+    Redirects to faculty login if not logged in (or the account no longer exists).
     Does NOT add any messages to avoid cross-role message leakage.
     """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if not await request.afaculty():
+                return redirect("faculty_login")  # silent redirect
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if not request.session.get("faculty_id"):
+        if not request.session.get("faculty_id") or not request.faculty:
             return redirect("faculty_login")  # silent redirect
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -0,0 +1,69 @@
+"""
+Plain-text extraction from submitted files, for similarity checks.
+
+PDFs use PyMuPDF (``fitz``), pypdf or poppler's ``pdftotext``, whichever is
+available. Office Open XML documents (.docx, .pptx, .pptm, ...) are read
+with the standard library, and source/text files are decoded directly.
+"""
+
+import html
+import re
+import shutil
+import subprocess
+import zipfile
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+TEXT_EXTENSIONS = {
+    "txt", "md", "csv", "py", "c", "h", "cpp", "hpp", "java", "js", "ts", "html", "css", "sql", "go", "rs", "kt",
+}
+OFFICE_TEXT_PARTS = re.compile(r"(word/document|ppt/slides/slide\d+|ppt/notesSlides/notesSlide\d+|xl/sharedStrings)\.xml")
+_TAG_RE = re.compile(r"<[^>]+>")
+MAX_TEXT_BYTES = 2 * 1024 * 1024
+
+
+def _pdf_text(path):
+    if fitz is not None:
+        with fitz.open(path) as document:
+            return "\n".join(page.get_text() for page in document)
+    if pypdf is not None:
+        reader = pypdf.PdfReader(path)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    if shutil.which("pdftotext"):
+        result = subprocess.run(["pdftotext", "-q", path, "-"], capture_output=True, timeout=60)
+        return result.stdout.decode("utf-8", "ignore")
+    return ""
+
+
+def _office_text(path):
+    parts = []
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            if OFFICE_TEXT_PARTS.fullmatch(name):
+                xml = archive.read(name).decode("utf-8", "ignore")
+                # Paragraph/run ends become spaces so words do not run together
+                parts.append(html.unescape(_TAG_RE.sub(" ", xml)))
+    return "\n".join(parts)
+
+
+def extract_text(path, file_name):
+    """Best-effort text of the file at ``path``; ``file_name`` decides the format."""
+    extension = file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+    if extension == "pdf":
+        text = _pdf_text(path)
+    elif zipfile.is_zipfile(path) and extension in {"docx", "docm", "pptx", "pptm", "ppsx", "xlsx", "xlsm"}:
+        text = _office_text(path)
+    elif extension in TEXT_EXTENSIONS:
+        with open(path, "rb") as handle:
+            text = handle.read(MAX_TEXT_BYTES).decode("utf-8", "ignore")
+    else:
+        text = ""
+    return text[:MAX_TEXT_BYTES]
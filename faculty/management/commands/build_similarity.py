@@ -0,0 +1,55 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from adminui.models import Problem
+from faculty import similarity
+from student.models import Submission
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract text from submissions, index their MinHash/LSH signatures and report "
+        "near-duplicate clusters per problem."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--problem", type=int, help="Only this problem id")
+        parser.add_argument("--rebuild", action="store_true", help="Re-fingerprint submissions already indexed")
+        parser.add_argument("--report-only", action="store_true", help="Skip indexing, just print clusters")
+        parser.add_argument("--threshold", type=float, default=similarity.THRESHOLD)
+
+    def handle(self, *args, **options):
+        problems = Problem.objects.order_by("id")
+        if options["problem"]:
+            problems = problems.filter(pk=options["problem"])
+
+        for problem in problems:
+            if not options["report_only"]:
+                submissions = Submission.objects.filter(problem=problem).order_by("id")
+                if not options["rebuild"]:
+                    submissions = submissions.filter(fingerprint__isnull=True)
+                indexed = skipped = failed = 0
+                for submission in submissions.iterator():
+                    try:
+                        result = similarity.fingerprint(submission)
+                    except Exception as exc:
+                        # One unreadable or malformed file must not stop the whole run
+                        logger.exception("Could not fingerprint submission %s", submission.id)
+                        self.stderr.write(f"submission {submission.id}: {exc!r}")
+                        failed += 1
+                        continue
+                    if result is None:
+                        skipped += 1
+                    else:
+                        indexed += 1
+                self.stdout.write(f"{problem.title}: {indexed} indexed, {skipped} without extractable text, "
+                                  f"{failed} failed")
+
+            for group in similarity.clusters(problem.id, options["threshold"]):
+                students = Submission.objects.filter(pk__in=group).values_list("student__student_id", flat=True)
+                self.stdout.write(self.style.WARNING(
+                    f"  near-duplicates in '{problem.title}': " + ", ".join(sorted(students))
+                ))
@@ -0,0 +1,75 @@
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import cache
+from django.db import router
+from django.utils.functional import SimpleLazyObject
+
+from adminui.models import Faculty
+
+IDENTITY_CACHE_TIMEOUT = 60
+# Only what the views read is cached; the password hash never leaves the database
+IDENTITY_FIELDS = ("id", "username", "faculty_id", "department")
+
+
+def _cache_key(faculty_id):
+    return f"identity:faculty:{faculty_id}"
+
+
+def _identity(obj):
+    return [getattr(obj, field) for field in IDENTITY_FIELDS]
+
+
+def _from_identity(values):
+    # Other fields are deferred: reading one loads it, and save() only writes the identity fields
+    return Faculty.from_db(router.db_for_read(Faculty), IDENTITY_FIELDS, values)
+
+
+def get_faculty(request):
+    faculty_id = request.session.get("faculty_id")
+    if not faculty_id:
+        return None
+    values = cache.get(_cache_key(faculty_id))
+    if values is not None:
+        return _from_identity(values)
+    faculty = Faculty.objects.only(*IDENTITY_FIELDS).filter(faculty_id=faculty_id).first()
+    if faculty is not None:
+        cache.set(_cache_key(faculty_id), _identity(faculty), IDENTITY_CACHE_TIMEOUT)
+    return faculty
+
+
+async def aget_faculty(request):
+    faculty_id = await request.session.aget("faculty_id")
+    if not faculty_id:
+        return None
+    values = await cache.aget(_cache_key(faculty_id))
+    if values is not None:
+        return _from_identity(values)
+    faculty = await Faculty.objects.only(*IDENTITY_FIELDS).filter(faculty_id=faculty_id).afirst()
+    if faculty is not None:
+        await cache.aset(_cache_key(faculty_id), _identity(faculty), IDENTITY_CACHE_TIMEOUT)
+    return faculty
+
+
+def forget_faculty(faculty_id):
+    cache.delete(_cache_key(faculty_id))
+
+
+class FacultyMiddleware:
+    """
+    Attach the logged-in faculty member as a lazy, briefly cached
+    ``request.faculty``, and ``await request.afaculty()`` for async views.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.faculty = SimpleLazyObject(lambda: get_faculty(request))
+        request.afaculty = partial(aget_faculty, request)
+        # In async mode this is the coroutine the handler awaits
+        return self.get_response(request)
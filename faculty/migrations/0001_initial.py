@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('adminui', '0008_problem_upload_limits'),
+        ('student', '0020_submissionpreview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.BinaryField()),
+                ('shingle_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='adminui.problem')),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='student.submission')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.CharField(max_length=16)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='adminui.problem')),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='student.submission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['problem', 'band', 'bucket'], name='lsh_bucket_lookup_idx')],
+            },
+        ),
+    ]
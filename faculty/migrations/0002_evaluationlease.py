@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminui', '0009_grade_aggregates'),
+        ('faculty', '0001_initial'),
+        ('student', '0021_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('faculty', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_leases', to='adminui.faculty')),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='lease', to='student.submission')),
+            ],
+        ),
+    ]
@@ -1,3 +1,42 @@
 from django.db import models
 
-# Create your models here.
+from adminui.models import Faculty, Problem
+from student.models import Submission
+
+
+class SubmissionFingerprint(models.Model):
+    """MinHash signature of a submission's extracted text (see faculty.similarity)."""
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, related_name="fingerprint")
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name="fingerprints")
+    signature = models.BinaryField()
+    shingle_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Fingerprint of submission {self.submission_id}"
+
+
+class LSHBucket(models.Model):
+    """One band of a signature; submissions sharing a bucket are near-duplicate candidates."""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name="lsh_buckets")
+    band = models.PositiveSmallIntegerField()
+    bucket = models.CharField(max_length=16)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["problem", "band", "bucket"], name="lsh_bucket_lookup_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.problem_id}/{self.band}/{self.bucket} -> {self.submission_id}"
+
+
+class EvaluationLease(models.Model):
+    """A faculty member's time-limited claim on a submission (see faculty.queue)."""
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, related_name="lease")
+    faculty = models.ForeignKey(Faculty, on_delete=models.CASCADE, related_name="evaluation_leases")
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Submission {self.submission_id} claimed by {self.faculty_id} until {self.expires_at}"
@@ -0,0 +1,93 @@
+"""
+Pending-evaluation queue.
+
+A faculty member claims ungraded submissions by taking a lease on them.
+Claims lock candidate rows with SELECT ... FOR UPDATE SKIP LOCKED, so
+concurrent claimers get disjoint batches instead of queueing on each
+other. A lease lapses on its own after EVALUATION_LEASE_SECONDS and is
+dropped as soon as marks are saved. Saving marks takes no lease of its own:
+save_marks() checks the leases and the current marks inside its UPDATE.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from student.models import Submission
+from .models import EvaluationLease
+
+
+def lease_seconds():
+    return getattr(settings, "EVALUATION_LEASE_SECONDS", 15 * 60)
+
+
+def _expiry():
+    return timezone.now() + timedelta(seconds=lease_seconds())
+
+
+def _held_by_others(faculty):
+    return EvaluationLease.objects.filter(
+        submission=OuterRef("pk"), expires_at__gt=timezone.now(),
+    ).exclude(faculty=faculty)
+
+
+def claim(faculty, count=1, problem_id=None):
+    """Lease up to ``count`` ungraded submissions, oldest first; return their ids.
+
+    Leases the faculty member already holds are renewed and count towards
+    the batch.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        held = list(
+            EvaluationLease.objects.filter(faculty=faculty, expires_at__gt=now, submission__faculty_marks__isnull=True)
+            .order_by("submission__submitted_at", "submission_id")
+            .values_list("submission_id", flat=True)[:count]
+        )
+        pending = Submission.objects.filter(faculty_marks__isnull=True).exclude(pk__in=held)
+        if problem_id:
+            pending = pending.filter(problem_id=problem_id)
+        fresh = list(
+            pending.filter(~Exists(_held_by_others(faculty)))
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("submitted_at", "id")
+            .values_list("pk", flat=True)[:count - len(held)]
+        )
+        ids = held + fresh
+        expires_at = _expiry()
+        EvaluationLease.objects.filter(submission_id__in=ids).delete()  # ours, or lapsed ones
+        EvaluationLease.objects.bulk_create(
+            [EvaluationLease(submission_id=pk, faculty=faculty, expires_at=expires_at) for pk in ids]
+        )
+    return ids
+
+
+def save_marks(faculty, submission, marks, remarks):
+    """
+    Store marks in one conditional UPDATE and return whether it applied. It
+    does not if another faculty member holds a live lease, or if the marks
+    are no longer the ones ``submission`` was read with (someone saved in
+    between), so concurrent graders never overwrite each other unseen.
+    """
+    saved = (
+        Submission.objects.filter(pk=submission.pk, faculty_marks=submission.faculty_marks)
+        .filter(~Exists(_held_by_others(faculty)))
+        .update(faculty_marks=marks, faculty_remarks=remarks, faculty=faculty)
+    )
+    if saved:
+        submission.faculty_marks, submission.faculty_remarks, submission.faculty = marks, remarks, faculty
+    return bool(saved)
+
+
+def release(submission_id, faculty=None):
+    leases = EvaluationLease.objects.filter(submission_id=submission_id)
+    if faculty is not None:
+        leases = leases.filter(faculty=faculty)
+    leases.delete()
+
+
+def release_many(submission_ids):
+    EvaluationLease.objects.filter(submission_id__in=submission_ids).delete()
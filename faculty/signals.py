@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from adminui.models import Faculty
+from . import queue
+from .middleware import forget_faculty
+
+# Sent with sender=Submission after a faculty member saves marks.
+# Arguments: submission, previous_marks (None when it was not graded before).
+submission_evaluated = Signal()
+
+# Sent once for a batch of marks saved together (batch grading) instead of
+# submission_evaluated per row. Arguments: changes, a list of
+# (submission, previous_marks) pairs.
+submissions_evaluated = Signal()
+
+
+@receiver([post_save, post_delete], sender=Faculty)
+def faculty_changed(sender, instance, **kwargs):
+    forget_faculty(instance.faculty_id)
+
+
+@receiver(submission_evaluated)
+def release_lease(sender, submission, **kwargs):
+    queue.release(submission.pk)
+
+
+@receiver(submissions_evaluated)
+def release_leases(sender, changes, **kwargs):
+    queue.release_many([submission.pk for submission, _ in changes])
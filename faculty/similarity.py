@@ -0,0 +1,167 @@
+"""
+Near-duplicate detection across the submissions of a problem.
+
+Each submission's text is cut into overlapping word shingles and summarized
+by a MinHash signature. The signature is split into bands and each band is
+hashed into an LSHBucket row, so candidates are found by an indexed lookup
+on (problem, band, bucket) instead of comparing every pair: indexing is
+linear in the number of submissions. Candidates are then confirmed by the
+fraction of equal signature slots, which estimates Jaccard similarity.
+
+With 32 bands of 4 rows, pairs around 0.45 similarity or more are likely
+to share a bucket; THRESHOLD decides what is reported. Buckets with more than
+MAX_BUCKET_SIZE members (text every submission shares, such as a template)
+are skipped when clustering: comparing within them is quadratic, and a real
+near-duplicate pair also shares buckets in its other bands.
+"""
+
+import hashlib
+import random
+import re
+import struct
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from student.models import Submission
+from .extract import extract_text
+from .models import LSHBucket, SubmissionFingerprint
+
+SHINGLE_SIZE = 5
+BANDS = 32
+ROWS = 4
+NUM_HASHES = BANDS * ROWS
+THRESHOLD = 0.5
+MAX_BUCKET_SIZE = 200
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20251018)  # fixed seed: signatures must stay comparable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text):
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in shingle_set]
+    return [
+        min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) if hashes else _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def pack(signature):
+    return struct.pack(f"<{NUM_HASHES}I", *signature)
+
+
+def unpack(data):
+    return struct.unpack(f"<{NUM_HASHES}I", bytes(data))
+
+
+def estimate(signature_a, signature_b):
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_HASHES
+
+
+def band_buckets(signature):
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        yield band, hashlib.blake2b(struct.pack(f"<{ROWS}I", *rows), digest_size=8).hexdigest()
+
+
+def fingerprint(submission):
+    """Extract, sign and bucket one submission. Returns None when no text could be extracted."""
+    text = extract_text(submission.file.path, submission.original_name or submission.file.name)
+    shingle_set = shingles(text)
+    with transaction.atomic():
+        LSHBucket.objects.filter(submission=submission).delete()
+        SubmissionFingerprint.objects.filter(submission=submission).delete()
+        if not shingle_set:
+            return None
+        signature = minhash(shingle_set)
+        result = SubmissionFingerprint.objects.create(
+            submission=submission, problem_id=submission.problem_id,
+            signature=pack(signature), shingle_count=len(shingle_set),
+        )
+        LSHBucket.objects.bulk_create(
+            LSHBucket(problem_id=submission.problem_id, submission=submission, band=band, bucket=bucket)
+            for band, bucket in band_buckets(signature)
+        )
+    return result
+
+
+def similar_to(submission, threshold=THRESHOLD):
+    """[(other submission, similarity)] for near-duplicates of ``submission``, most similar first."""
+    scores = {}
+    # Byte-identical files share one content-addressed blob
+    for other_id in (Submission.objects.filter(problem_id=submission.problem_id, file=submission.file.name)
+                     .exclude(pk=submission.pk).values_list("id", flat=True)):
+        scores[other_id] = 1.0
+
+    own = SubmissionFingerprint.objects.filter(submission=submission).first()
+    if own is not None:
+        signature = unpack(own.signature)
+        # One query for all bands: each (band, bucket) pair is a range on the lookup index
+        same_bucket = Q()
+        for band, bucket in band_buckets(signature):
+            same_bucket |= Q(band=band, bucket=bucket)
+        candidate_ids = (LSHBucket.objects.filter(same_bucket, problem_id=submission.problem_id)
+                         .exclude(submission_id=submission.pk).values("submission_id"))
+        for other in SubmissionFingerprint.objects.filter(submission_id__in=candidate_ids):
+            score = estimate(signature, unpack(other.signature))
+            if score >= threshold:
+                scores[other.submission_id] = max(score, scores.get(other.submission_id, 0))
+
+    others = Submission.objects.select_related("student").in_bulk(list(scores))
+    return sorted(((others[pk], score) for pk, score in scores.items() if pk in others),
+                  key=lambda pair: -pair[1])
+
+
+def clusters(problem_id, threshold=THRESHOLD):
+    """Groups (lists of submission ids, largest first) of near-duplicates within a problem."""
+    members = defaultdict(list)
+    for band, bucket, submission_id in (LSHBucket.objects.filter(problem_id=problem_id)
+                                        .values_list("band", "bucket", "submission_id").iterator()):
+        members[(band, bucket)].append(submission_id)
+
+    signatures = {}
+    parent = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for ids in members.values():
+        if not 2 <= len(ids) <= MAX_BUCKET_SIZE:
+            continue
+        missing = [pk for pk in ids if pk not in signatures]
+        if missing:
+            for pk, data in SubmissionFingerprint.objects.filter(submission_id__in=missing).values_list(
+                    "submission_id", "signature"):
+                signatures[pk] = unpack(data)
+        # Every pair: a bucket holds few ids, and a close pair need not include the first one
+        for i, first in enumerate(ids):
+            for other in ids[i + 1:]:
+                if find(first) != find(other) and estimate(signatures[first], signatures[other]) >= threshold:
+                    parent[find(other)] = find(first)
+
+    # Byte-identical files share one content-addressed blob, text or not
+    by_file = defaultdict(list)
+    for name, pk in Submission.objects.filter(problem_id=problem_id).values_list("file", "id").iterator():
+        by_file[name].append(pk)
+    for ids in by_file.values():
+        for other in ids[1:]:
+            parent[find(other)] = find(ids[0])
+
+    groups = defaultdict(list)
+    for pk in parent:
+        groups[find(pk)].append(pk)
+    return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=len, reverse=True)
@@ -1,3 +1,206 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from adminui.models import Faculty, Problem
+from student import leaderboard
+from student.models import LeaderboardEntry, Student, Submission
+from . import middleware, queue, similarity, views
+from .models import EvaluationLease, LSHBucket, SubmissionFingerprint
+
+TEXT = "the quick brown fox jumps over the lazy dog near the river bank at dawn every single day"
+
+
+def make_submission(problem, n, file_name=None):
+    student = Student.objects.create(full_name=f"Student {n}", student_id=f"STU{n}", password="x",
+                                     gender="other", year=1, semester=1, department="CSE")
+    return Submission.objects.create(problem=problem, student=student, file=file_name or f"submissions/{n}.pdf")
+
+
+def make_faculty(n):
+    return Faculty.objects.create(username=f"Faculty {n}", password="x", faculty_id=f"FAC{n}", gender="other",
+                                  department="CSE")
+
+
+def store_signature(submission, signature, buckets):
+    SubmissionFingerprint.objects.create(submission=submission, problem_id=submission.problem_id,
+                                         signature=similarity.pack(signature), shingle_count=1)
+    LSHBucket.objects.bulk_create(LSHBucket(problem_id=submission.problem_id, submission=submission,
+                                            band=band, bucket=bucket) for band, bucket in buckets)
+
+
+# ----- Identity cache -----
+
+class IdentityCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.faculty = make_faculty(1)
+        session = self.client.session
+        session["faculty_id"] = self.faculty.faculty_id
+        session.save()
+
+    def test_cache_holds_identity_fields_only(self):
+        self.assertEqual(self.client.get("/faculty/dashboard/").status_code, 200)
+        cached = cache.get(middleware._cache_key("FAC1"))
+        self.assertEqual(cached, [self.faculty.pk, "Faculty 1", "FAC1", "CSE"])
+
+    def test_cached_faculty_can_grade(self):
+        problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        submission = make_submission(problem, 1)
+        self.client.get("/faculty/dashboard/")  # warm the cache
+        response = self.client.post(f"/faculty/evaluate/{submission.pk}/", {"marks": "4", "remarks": ""})
+        self.assertEqual(response.status_code, 302)
+        submission.refresh_from_db()
+        self.assertEqual((submission.faculty_id, submission.faculty_marks), (self.faculty.pk, 4))
+
+    def test_login_required_keeps_the_view_name(self):
+        self.assertEqual(views.faculty_dashboard.__name__, "faculty_dashboard")
+        self.assertEqual(views.evaluate_submission.__name__, "evaluate_submission")
+
+
+# ----- Similarity -----
+
+class SimilarityTests(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+
+    def fingerprint(self, submission, text):
+        with mock.patch.object(similarity, "extract_text", return_value=text):
+            return similarity.fingerprint(submission)
+
+    def test_similar_to_looks_up_all_bands_in_one_query(self):
+        first, second, third = (make_submission(self.problem, n) for n in range(3))
+        self.fingerprint(first, TEXT)
+        self.fingerprint(second, TEXT + " again")
+        self.fingerprint(third, "completely different words about some other topic entirely for this test")
+        with CaptureQueriesContext(connection) as queries:
+            similar = similarity.similar_to(first)
+        self.assertEqual([other.pk for other, _ in similar], [second.pk])
+        self.assertLessEqual(len(queries), 4)  # identical files, own signature, candidates, in_bulk
+
+    def test_clusters_pairs_that_do_not_include_the_first_bucket_member(self):
+        first, second, third = (make_submission(self.problem, n) for n in range(3))
+        shared = [(0, "shared")]
+        store_signature(first, [1] * similarity.NUM_HASHES, shared)
+        store_signature(second, [2] * similarity.NUM_HASHES, shared)
+        store_signature(third, [2] * similarity.NUM_HASHES, shared)
+        self.assertEqual(similarity.clusters(self.problem.pk), [[second.pk, third.pk]])
+
+    def test_oversized_buckets_are_skipped(self):
+        submissions = [make_submission(self.problem, n) for n in range(3)]
+        for submission in submissions:
+            store_signature(submission, [1] * similarity.NUM_HASHES, [(0, "template")])
+        with mock.patch.object(similarity, "MAX_BUCKET_SIZE", 2):
+            self.assertEqual(similarity.clusters(self.problem.pk), [])
+        self.assertEqual(similarity.clusters(self.problem.pk), [[s.pk for s in submissions]])
+
+    def test_command_skips_a_failing_submission(self):
+        broken, first, second = (make_submission(self.problem, n) for n in range(3))
+
+        def extract(path, name):
+            if name == broken.file.name:
+                raise KeyError("malformed document")
+            return TEXT
+
+        out, err = io.StringIO(), io.StringIO()
+        with mock.patch.object(similarity, "extract_text", side_effect=extract), \
+                self.assertLogs("faculty.management.commands.build_similarity", "ERROR") as logs:
+            call_command("build_similarity", stdout=out, stderr=err)
+        self.assertIn("2 indexed, 0 without extractable text, 1 failed", out.getvalue())
+        self.assertIn(f"submission {broken.pk}", logs.output[0])
+        self.assertIn(f"submission {broken.pk}: KeyError", err.getvalue())
+
+
+# ----- Evaluation queue -----
+
+class EvaluateLeaseTests(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        self.submission = make_submission(self.problem, 1)
+        self.faculty = make_faculty(1)
+        session = self.client.session
+        session["faculty_id"] = self.faculty.faculty_id
+        session.save()
+        self.url = f"/faculty/evaluate/{self.submission.pk}/"
+
+    def test_viewing_takes_no_lease(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        Submission.objects.filter(pk=self.submission.pk).update(faculty_marks=5)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertFalse(EvaluationLease.objects.exists())
+
+    def test_saving_marks_takes_no_lease_and_stays_within_budget(self):
+        with self.assertNoLogs("adminui.middleware", "WARNING"), CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"marks": "6", "remarks": ""})
+        self.assertEqual(response.status_code, 302)
+        self.assertLessEqual(len(queries), settings.QUERY_BUDGETS["evaluate_submission"])
+        self.assertFalse([q for q in queries if "INSERT" in q["sql"] and "evaluationlease" in q["sql"]])
+        self.assertFalse(EvaluationLease.objects.exists())
+        self.submission.refresh_from_db()
+        self.assertEqual((self.submission.faculty_marks, self.submission.faculty_id), (6, self.faculty.pk))
+
+    def test_marks_saved_meanwhile_are_not_overwritten(self):
+        stale = Submission.objects.get(pk=self.submission.pk)
+        self.assertTrue(queue.save_marks(make_faculty(2), Submission.objects.get(pk=self.submission.pk), 3, ""))
+        self.assertFalse(queue.save_marks(self.faculty, stale, 6, ""))
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.faculty_marks, 3)
+
+    @override_settings(QUERY_BUDGETS={"evaluate_submission": 1})
+    def test_over_budget_request_is_logged(self):
+        with self.assertLogs("adminui.middleware", "WARNING") as logs:
+            self.client.get(self.url)
+        self.assertRegex(logs.output[0], rf"evaluate_submission ran \d+ queries \(budget 1\): GET {self.url}")
+
+    def test_another_holder_blocks_saving(self):
+        EvaluationLease.objects.create(submission=self.submission, faculty=make_faculty(2),
+                                       expires_at=timezone.now() + timedelta(minutes=5))
+        self.assertContains(self.client.get(self.url), "is evaluating this submission")
+        self.client.post(self.url, {"marks": "6", "remarks": ""})
+        self.submission.refresh_from_db()
+        self.assertIsNone(self.submission.faculty_marks)
+
+
+# ----- Batch grading -----
+
+class BatchGradeTests(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        self.faculty = make_faculty(1)
+        session = self.client.session
+        session["faculty_id"] = self.faculty.faculty_id
+        session.save()
+        self.url = f"/faculty/batch/{self.problem.pk}/"
+
+    def save_batch(self, submissions, marks):
+        data = {"submission": [str(s.pk) for s in submissions]}
+        data.update({f"marks_{s.pk}": str(value) for s, value in zip(submissions, marks)})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        return len(queries)
+
+    def test_batch_updates_derived_tables_in_constant_queries(self):
+        small = [make_submission(self.problem, n) for n in range(2)]
+        large = [make_submission(self.problem, n) for n in range(2, 22)]
+        queue.claim(self.faculty, 30, problem_id=self.problem.pk)
+
+        small_queries = self.save_batch(small, [0, 5])
+        large_queries = self.save_batch(large, [n % 11 for n in range(20)])
+
+        self.assertLessEqual(large_queries, small_queries)  # the first batch also creates the aggregate rows
+        self.assertFalse(EvaluationLease.objects.exists())
+        self.assertEqual(LeaderboardEntry.objects.count(), 22)
+        self.assertEqual(leaderboard.standing(small[0].student)["total"], 0)
+        totals = dict(LeaderboardEntry.objects.values_list("student_id", "total"))
+        leaderboard.rebuild()
+        self.assertEqual(dict(LeaderboardEntry.objects.values_list("student_id", "total")), totals)
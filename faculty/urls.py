@@ -5,5 +5,7 @@ urlpatterns = [
     path('login/', views.faculty_login, name='faculty_login'),
     path('dashboard/', views.faculty_dashboard, name='faculty_dashboard'),
     path('logout/', views.faculty_logout, name='faculty_logout'),
+    path("batch/<int:problem_id>/", views.batch_grade, name="batch_grade"),
+    path("next/", views.next_ungraded, name="next_ungraded"),
     path("evaluate/<int:submission_id>/", views.evaluate_submission, name="evaluate_submission"),
 ]
@@ -1,13 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
-from django.contrib.auth.hashers import check_password
-from django.core.paginator import Paginator
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from adminui.passwords import verify_password
 from django.views.decorators.cache import never_cache
 from adminui.models import Faculty
+from adminui import stats
+from adminui.pagination import KeysetPaginator
 from student.models import Submission
 from student.models import Problem
 from faculty.decorator import faculty_login_required
-from django.db.models import Q
+from faculty import queue
+from faculty.signals import submission_evaluated, submissions_evaluated
+from faculty.similarity import similar_to
+from student.search import matching_students
+from asgiref.sync import sync_to_async
+
+# Batch grading page size: default and upper bound
+BATCH_SIZE = 20
+BATCH_MAX = 100
 
 # ----- Faculty Login -----
 @never_cache
@@ -27,7 +40,7 @@ def faculty_login(request):
 
         try:
             faculty = Faculty.objects.get(faculty_id=faculty_id_input)
-            if check_password(password_input, faculty.password):
+            if verify_password("faculty", password_input, faculty):
                 request.session['faculty_id'] = faculty.faculty_id
                 request.session['faculty_username'] = faculty.username
                 return redirect('faculty_dashboard')
@@ -46,27 +59,25 @@ def faculty_login(request):
 # ----- Faculty Dashboard -----
 @faculty_login_required
 @never_cache
-def faculty_dashboard(request):
-    faculty_username = request.session.get('faculty_username')
-    if not faculty_username:
-        return redirect('faculty_login')
+async def faculty_dashboard(request):
+    faculty = await request.afaculty()
 
-    submissions_list = Submission.objects.select_related("student", "problem").order_by("-submitted_at")
+    submissions_list = Submission.objects.select_related("student", "problem", "preview", "lease__faculty")
     search_query = request.GET.get("search", "").strip()
     if search_query:
-        submissions_list = submissions_list.filter(
-            Q(student__full_name__icontains=search_query) |
-            Q(student__student_id__icontains=search_query)
-        )
+        submissions_list = submissions_list.filter(student_id__in=matching_students(search_query))
 
-    paginator = Paginator(submissions_list, 7)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(submissions_list, 7)
+    page_obj = await paginator.aget_page(request.GET.get("cursor"))
 
-    response = render(request, "faculty/dashboard.html", {
-        "faculty_username": faculty_username,
+    # Rendering reads the session and messages, which are sync-only
+    response = await sync_to_async(render)(request, "faculty/dashboard.html", {
+        "faculty_username": faculty.username,
+        "problems": [p async for p in Problem.objects.order_by("-created_at").only("id", "title")],
+        "faculty": faculty,
         "page_obj": page_obj,
         "search": search_query,
+        "now": timezone.now(),
     })
     response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
     response['Pragma'] = 'no-cache'
@@ -75,40 +86,59 @@ def faculty_dashboard(request):
 
 
 # ----- Evaluate Submission -----
+def _parse_marks(value, total_marks):
+    """Return (marks, error message) for a marks field."""
+    try:
+        marks = int(value)
+    except (ValueError, TypeError):
+        return None, "Please enter a valid number for marks."
+    if marks < 0:
+        return None, "Marks cannot be negative."
+    if marks > total_marks:
+        return None, f"Marks cannot exceed {total_marks}."
+    return marks, ""
+
+
 @faculty_login_required
 @never_cache
 def evaluate_submission(request, submission_id):
-    submission = get_object_or_404(Submission, id=submission_id)
+    submission = get_object_or_404(
+        Submission.objects.select_related("student", "problem", "preview", "lease__faculty"), id=submission_id
+    )
     error_message = ""
+    faculty = request.faculty
 
-    faculty_id = request.session.get("faculty_id")
-    try:
-        faculty = Faculty.objects.get(faculty_id=faculty_id)
-    except Faculty.DoesNotExist:
-        messages.error(request, "Logged-in faculty not found.")
-        return redirect("faculty_dashboard")
+    # Viewing never takes a lease ("Next ungraded" already claimed it); saving re-checks the
+    # leases and the marks in its UPDATE, so two faculty members cannot grade it at once
+    lease = getattr(submission, "lease", None)
+    holder = lease if lease and lease.faculty_id != faculty.pk and lease.expires_at > timezone.now() else None
+    if holder:
+        error_message = (f"{holder.faculty.username} is evaluating this submission "
+                         f"(claimed until {timezone.localtime(holder.expires_at):%H:%M}).")
 
-    if request.method == "POST":
-        marks_input = request.POST.get("marks")
+    if request.method == "POST" and not holder:
         remarks = request.POST.get("remarks", "").strip()
-        try:
-            marks = int(marks_input)
-            if marks < 0:
-                error_message = "Marks cannot be negative."
-            elif marks > submission.problem.total_marks:
-                error_message = f"Marks cannot exceed {submission.problem.total_marks}."
-            else:
-                submission.faculty_marks = marks
-                submission.faculty_remarks = remarks
-                submission.faculty = faculty
-                submission.save()
+        marks, error_message = _parse_marks(request.POST.get("marks"), submission.problem.total_marks)
+        if not error_message:
+            previous_marks = submission.faculty_marks
+            with transaction.atomic():
+                saved = queue.save_marks(faculty, submission, marks, remarks)
+                if saved:
+                    stats.touch_on_commit("submission")  # update() sends no post_save
+                    submission_evaluated.send(sender=Submission, submission=submission, previous_marks=previous_marks)
+            if saved:
+                if request.POST.get("then") == "next":
+                    return redirect("next_ungraded")
                 return redirect("faculty_dashboard")
-        except (ValueError, TypeError):
-            error_message = "Please enter a valid number for marks."
+            submission.refresh_from_db(fields=["faculty_marks", "faculty_remarks", "faculty"])
+            error_message = ("Another faculty member is evaluating this submission or has just saved marks for it. "
+                             "Check the current marks before saving again.")
 
     response = render(request, "faculty/evaluate_submission.html", {
         "submission": submission,
-        "error_message": error_message
+        "similar_submissions": similar_to(submission),
+        "error_message": error_message,
+        "locked": bool(holder),
     })
     response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
     response['Pragma'] = 'no-cache'
@@ -116,6 +146,87 @@ def evaluate_submission(request, submission_id):
     return response
 
 
+# ----- Evaluation Queue -----
+@faculty_login_required
+@never_cache
+def next_ungraded(request):
+    problem = request.GET.get("problem", "")
+    claimed = queue.claim(request.faculty, settings.EVALUATION_CLAIM_BATCH,
+                          problem_id=int(problem) if problem.isdigit() else None)
+    if not claimed:
+        messages.info(request, "No ungraded submissions are waiting.")
+        return redirect("faculty_dashboard")
+    return redirect("evaluate_submission", submission_id=claimed[0])
+
+
+# ----- Batch Grading -----
+@faculty_login_required
+@never_cache
+def batch_grade(request, problem_id):
+    problem = get_object_or_404(Problem, id=problem_id)
+    faculty = request.faculty
+    size = request.GET.get("size", "")
+    size = min(int(size), BATCH_MAX) if size.isdigit() and int(size) > 0 else BATCH_SIZE
+    errors = {}
+
+    if request.method == "POST":
+        ids = [int(pk) for pk in request.POST.getlist("submission") if pk.isdigit()]
+        with transaction.atomic():
+            submissions = list(
+                Submission.objects.select_for_update(of=("self",))
+                .select_related("student", "problem", "preview", "lease__faculty")
+                .filter(problem=problem, pk__in=ids)
+                .order_by("submitted_at", "id")
+            )
+            graded = []
+            for submission in submissions:
+                value = request.POST.get(f"marks_{submission.pk}", "").strip()
+                submission.entered_marks = value
+                submission.entered_remarks = request.POST.get(f"remarks_{submission.pk}", "").strip()
+                if not value:
+                    continue  # left blank: stays in the queue
+                lease = getattr(submission, "lease", None)
+                if lease and lease.faculty_id != faculty.pk and lease.expires_at > timezone.now():
+                    errors[submission.pk] = f"{lease.faculty.username} is evaluating this submission."
+                    continue
+                marks, error = _parse_marks(value, problem.total_marks)
+                if error:
+                    errors[submission.pk] = error
+                    continue
+                graded.append((submission, submission.faculty_marks))
+                submission.faculty_marks = marks
+                submission.faculty_remarks = submission.entered_remarks
+                submission.faculty = faculty
+
+            if not errors and graded:
+                Submission.objects.bulk_update(
+                    [submission for submission, _ in graded],
+                    ["faculty_marks", "faculty_remarks", "faculty"],
+                )
+                stats.touch_on_commit("submission")  # bulk_update sends no post_save
+                # One signal for the batch: receivers apply grouped updates instead of per-row ones
+                submissions_evaluated.send(sender=Submission, changes=graded)
+
+        if not errors:
+            messages.success(request, f"Saved {len(graded)} evaluation{'s' if len(graded) != 1 else ''}.")
+            return redirect(f"{reverse('batch_grade', args=[problem.id])}?size={size}")
+    else:
+        claimed = queue.claim(faculty, size, problem_id=problem.id)
+        submissions = list(
+            Submission.objects.select_related("student", "preview")
+            .filter(pk__in=claimed)
+            .order_by("submitted_at", "id")
+        )
+
+    rows = [(submission, errors.get(submission.pk, "")) for submission in submissions]
+    return render(request, "faculty/batch_grade.html", {
+        "problem": problem,
+        "rows": rows,
+        "size": size,
+        "has_errors": bool(errors),
+    })
+
+
 # ----- Faculty Logout -----
 @faculty_login_required
 @never_cache
@@ -2,6 +2,9 @@
 ASGI config for myproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with e.g. ``uvicorn myproject.asgi:application``: the dashboards,
+lists, JSON API and submission downloads are async views, and downloads are
+streamed without tying up a thread for the whole transfer.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
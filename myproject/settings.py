@@ -43,11 +43,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'adminui.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'student.middleware.StudentMiddleware',
+    'faculty.middleware.FacultyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -109,6 +112,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hashing algorithm and cost per role (see adminui.passwords). Raising a
+# policy upgrades existing hashes on each account's next successful login;
+# lowering one never rehashes. The student cost is below Django's default
+# (870000) to keep logins fast, so a student hash made at a higher cost is
+# kept as it is instead of being weakened.
+
+PASSWORD_POLICY = {
+    "student": {"algorithm": "pbkdf2_sha256", "iterations": 600000},
+    "faculty": {"algorithm": "pbkdf2_sha256", "iterations": 870000},
+}
+
+# Threads available for password hashing across all concurrent logins
+PASSWORD_HASHING_WORKERS = 4
+
+# Processes hashing passwords during a bulk CSV import (see adminui.bulk_import)
+BULK_IMPORT_WORKERS = 2
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -141,4 +161,43 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 USE_TZ = True
-TIME_ZONE = "Asia/Kolkata"
\ No newline at end of file
+TIME_ZONE = "Asia/Kolkata"
+
+# Largest per-problem upload limit an admin may set, in MB.
+SUBMISSION_MAX_UPLOAD_MB = 1024
+
+# Threads rendering submission previews in the background (0 disables;
+# run "manage.py build_previews" instead).
+PREVIEW_WORKERS = 2
+
+# Protected file delivery (see student.downloads.aserve_file). None streams
+# from Django; "nginx" uses X-Accel-Redirect to SENDFILE_URL, which must be an
+# internal location aliased to MEDIA_ROOT:
+#     location /protected-media/ { internal; alias /path/to/media/; }
+# "apache" uses X-Sendfile (mod_xsendfile) with the absolute file path.
+SENDFILE_BACKEND = None
+SENDFILE_URL = "/protected-media/"
+
+# Faculty evaluation queue (see faculty.queue): how long a claim on a
+# submission lasts, and how many submissions "Next ungraded" claims at once.
+EVALUATION_LEASE_SECONDS = 15 * 60
+EVALUATION_CLAIM_BATCH = 5
+
+# Request metrics (see adminui.metrics): samples kept per view for the
+# percentiles on /metrics/, and the most SQL queries each URL name may run
+# before the request is logged and counted as over budget (None: no limit).
+METRICS_WINDOW = 1000
+DEFAULT_QUERY_BUDGET = 30
+QUERY_BUDGETS = {
+    "dashboard": 10,
+    "student_list": 8,
+    "faculty_list": 8,
+    "problem_upload": 8,
+    "analytics": 8,
+    "student_dashboard": 12,
+    "faculty_dashboard": 10,
+    "download_submission": 5,
+    "evaluate_submission": 24,  # saving marks updates the analytics and leaderboard tables
+    "batch_grade": None,  # grows with the batch size
+    "export_marks": None,
+}
@@ -0,0 +1,38 @@
+"""
+Benchmark settings for the bench_* management commands.
+
+Uses myproject.settings on a local SQLite file by default so the
+benchmarks run anywhere; set BENCH_DATABASE=mysql to keep the MySQL
+database from myproject.settings (the commands always work in a
+throw-away test database).
+
+bench_servers starts real server processes on these settings and points
+them at its test database and media directory through BENCH_DATABASE_NAME
+and BENCH_MEDIA_ROOT.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+if os.environ.get("BENCH_DATABASE", "sqlite") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "bench.sqlite3",
+            # A file, not SQLite's default in-memory test database, so client threads share it
+            "TEST": {"NAME": str(BASE_DIR / "bench-test.sqlite3")},
+            # Take the write lock when a transaction starts, so concurrent clients wait for it
+            # instead of failing with "database is locked" when a read transaction upgrades
+            "OPTIONS": {"timeout": 30, "transaction_mode": "IMMEDIATE"},
+        }
+    }
+
+if os.environ.get("BENCH_DATABASE_NAME"):
+    DATABASES["default"]["NAME"] = os.environ["BENCH_DATABASE_NAME"]
+if os.environ.get("BENCH_MEDIA_ROOT"):
+    MEDIA_ROOT = os.environ["BENCH_MEDIA_ROOT"]
+
+# Keep background preview rendering from competing with the measured requests
+PREVIEW_WORKERS = 0
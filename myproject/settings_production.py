@@ -0,0 +1,80 @@
+"""
+Production settings for myproject.
+
+Use with DJANGO_SETTINGS_MODULE=myproject.settings_production. Everything not
+overridden here comes from myproject.settings; the knobs below can be tuned
+through environment variables without editing code.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+DEBUG = os.environ.get("DJANGO_DEBUG", "") == "1"
+
+
+# Database: keep connections open between requests instead of reconnecting
+# every time, and ping them before reuse so a MySQL restart is survived.
+
+DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+
+# Templates: parse each template once per process instead of on every render.
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,  # the loaders below take its place
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "debug": DEBUG,
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ]),
+            ],
+        },
+    }
+]
+
+
+# Cache: "file" is shared by every worker process on the host, so the
+# invalidations done by signals are seen everywhere. "locmem" is faster but
+# per-process; only use it with a single worker process.
+
+CACHE_BACKEND = os.environ.get("DJANGO_CACHE_BACKEND", "file")
+
+if CACHE_BACKEND == "locmem":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "simats",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", str(BASE_DIR / ".cache")),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+
+# Sessions: "cached_db" serves reads from the cache and only writes through
+# to MySQL on change; "signed_cookies" needs no server-side storage at all.
+
+SESSION_ENGINE = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}[os.environ.get("DJANGO_SESSION_BACKEND", "cached_db")]
+SESSION_COOKIE_HTTPONLY = True
+
+
+# Let the front-end server send submission files: "nginx", "apache" or "" to
+# stream from Django.
+
+SENDFILE_BACKEND = os.environ.get("DJANGO_SENDFILE_BACKEND", "") or None
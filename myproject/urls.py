@@ -16,14 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 
+# Media is not served publicly: submission files go through
+# student.views.download_submission, which checks access first.
 urlpatterns = [
     path("admin/", admin.site.urls),  # Django default admin
     path("", include("adminui.urls")),  # your custom admin UI
     path("student/", include("student.urls")),
     path("faculty/", include("faculty.urls")),
     
-]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
 
@@ -1,10 +1,20 @@
 from django.shortcuts import redirect
 from django.views.decorators.cache import never_cache
+from asgiref.sync import iscoroutinefunction
 
 def student_login_required(view_func):
+    if iscoroutinefunction(view_func):
+        @never_cache  # prevents browser caching
+        async def async_wrapper(request, *args, **kwargs):
+            if not await request.astudent():
+                # Redirect to landing page if not logged in
+                return redirect("login_options")
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
     @never_cache  # prevents browser caching
     def wrapper(request, *args, **kwargs):
-        if not request.session.get("student_id"):
+        if not request.session.get("student_id") or not request.student:
             # Redirect to landing page if not logged in
             return redirect("login_options")
         return view_func(request, *args, **kwargs)
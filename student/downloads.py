@@ -0,0 +1,152 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_etags
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+async def acan_view_submission(request, submission):
+    """Admins, any faculty member and the student who owns it may open a submission."""
+    user = await request.auser()
+    if user.is_authenticated and user.is_staff:
+        return True
+    if await request.afaculty():
+        return True
+    student = await request.astudent()
+    if student:
+        return submission.student_id == student.pk
+    return False
+
+
+def _etag(name, stat):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    if re.fullmatch(r"[0-9a-f]{64}", stem):
+        return f'"{stem}"'  # content-addressed: the name is the content hash
+    return f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range, None to ignore it, or False if unsatisfiable."""
+    match = _RANGE_RE.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), int(last) if last else size - 1
+    else:
+        start, end = max(0, size - int(last)), size - 1
+    if start >= size or start > end:
+        return False
+    return start, min(end, size - 1)
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+async def _aread_range(path, start, length):
+    # Disk reads run in worker threads so a slow disk never stalls the event loop
+    handle = await sync_to_async(open, thread_sensitive=False)(path, "rb")
+    try:
+        handle.seek(start)
+        while length > 0:
+            chunk = await sync_to_async(handle.read, thread_sensitive=False)(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+async def aserve_file(request, storage, name, download_name=None):
+    """
+    Send a stored file after the caller has authorized the request.
+
+    With settings.SENDFILE_BACKEND set, the body is handed to the front-end
+    server ("nginx": X-Accel-Redirect to SENDFILE_URL, "apache": X-Sendfile
+    with the absolute path), which then takes care of ranges and the copy.
+    Otherwise Django answers itself: conditional GETs via ETag and
+    Last-Modified, single byte ranges, and a FileResponse that WSGI servers
+    pass to sendfile(2) through wsgi.file_wrapper. Under ASGI the body is an
+    async generator instead: Django would read a sync iterator such as
+    FileResponse into memory in one go before sending it. The file system
+    lookups run in a worker thread.
+    """
+    path, stat = await sync_to_async(_locate, thread_sensitive=False)(storage, name)
+    return _respond(request, name, path, stat, download_name)
+
+
+def _locate(storage, name):
+    path = storage.path(name)
+    return path, os.stat(path)
+
+
+def _respond(request, name, path, stat, download_name):
+    etag = _etag(name, stat)
+    last_modified = int(stat.st_mtime)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        # A 304 must carry the same validators and caching rules as the 200 it stands for
+        return _add_validators(not_modified, etag, last_modified)
+
+    download_name = download_name or os.path.basename(name)
+    content_type = mimetypes.guess_type(download_name)[0] or "application/octet-stream"
+    backend = getattr(settings, "SENDFILE_BACKEND", None)
+
+    if backend == "nginx":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(settings.SENDFILE_URL.rstrip("/") + "/" + name)
+    elif backend == "apache":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = path
+    else:
+        byte_range = None
+        if "HTTP_RANGE" in request.META:
+            if_range = request.META.get("HTTP_IF_RANGE")
+            if not if_range or etag in parse_etags(if_range):
+                byte_range = _parse_range(request.META["HTTP_RANGE"], stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+        read_range = _aread_range if isinstance(request, ASGIRequest) else _read_range
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(read_range(path, start, end - start + 1),
+                                             status=206, content_type=content_type)
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            response["Content-Length"] = str(end - start + 1)
+        elif read_range is _aread_range:
+            response = StreamingHttpResponse(read_range(path, 0, stat.st_size), content_type=content_type)
+            response["Content-Length"] = str(stat.st_size)
+        else:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["Accept-Ranges"] = "bytes"
+
+    response["Content-Disposition"] = content_disposition_header(False, download_name)
+    return _add_validators(response, etag, last_modified)
+
+
+def _add_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
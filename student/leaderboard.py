@@ -0,0 +1,134 @@
+"""
+Per-department leaderboard.
+
+Each student's marks total lives in LeaderboardEntry and is adjusted by
+the difference whenever marks are saved or graded submissions deleted, so a
+rank is a count over the (department, total) index instead of a SUM over all
+submissions. That count is a range scan of the entries ahead in the
+department, so a rank costs O(department size) at worst, not O(log n): fine
+for departments of a few thousand students. Beyond that, keep precomputed
+rank buckets per department instead.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Count, F, Q, Sum, Value, When
+
+from .models import LeaderboardEntry, Student, Submission
+
+
+def submission_removed(submission):
+    """Take a deleted submission's marks off the board (post_delete: the row is already gone)."""
+    if submission.faculty_marks is not None:
+        _remove_totals({submission.student_id: submission.faculty_marks}, Submission.objects.all())
+
+
+def submissions_removed(submissions):
+    """Take the marks of a queryset of submissions about to be deleted, e.g. a problem's, off the board."""
+    totals = dict(
+        submissions.filter(faculty_marks__isnull=False).order_by()
+        .values_list("student_id").annotate(total=Sum("faculty_marks"))
+    )
+    if totals:
+        _remove_totals(totals, Submission.objects.exclude(pk__in=submissions.values("pk")))
+
+
+def _remove_totals(totals, remaining):
+    # Like rebuild(), a student with no graded submission left in ``remaining`` is not ranked at all
+    with transaction.atomic():
+        _shift({pk: -marks for pk, marks in totals.items() if marks})
+        graded = remaining.filter(student_id__in=totals, faculty_marks__isnull=False).values("student_id")
+        LeaderboardEntry.objects.filter(student_id__in=totals).exclude(student_id__in=graded).delete()
+
+
+def marks_changed(submission, previous_marks):
+    marks_changed_many([(submission, previous_marks)])
+
+
+def marks_changed_many(changes):
+    """
+    Apply (submission, previous marks) pairs: entries are created in bulk and
+    all totals move in one CASE update, whatever the number of submissions.
+    """
+    deltas = defaultdict(int)
+    departments = {}
+    for submission, previous_marks in changes:
+        deltas[submission.student_id] += (submission.faculty_marks or 0) - (previous_marks or 0)
+        departments[submission.student_id] = submission.student.department
+    if not deltas:
+        return
+    with transaction.atomic():
+        # Entries are created even for a zero delta: a first graded submission scoring 0 still ranks
+        existing = set(LeaderboardEntry.objects.filter(student_id__in=deltas).values_list("student_id", flat=True))
+        LeaderboardEntry.objects.bulk_create(
+            [LeaderboardEntry(student_id=pk, department=departments[pk]) for pk in deltas if pk not in existing],
+            ignore_conflicts=True,
+        )
+        _shift({pk: delta for pk, delta in deltas.items() if delta})
+
+
+def _shift(deltas):
+    """Add {student id: delta} to the totals in one CASE update."""
+    if deltas:
+        LeaderboardEntry.objects.filter(student_id__in=deltas).update(total=F("total") + Case(
+            *[When(student_id=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            default=Value(0), output_field=BigIntegerField(),
+        ))
+
+
+def move_student(student):
+    LeaderboardEntry.objects.filter(student=student).exclude(department=student.department).update(
+        department=student.department
+    )
+
+
+def standing(student):
+    """Return {"rank", "total", "count", "top_percent"} within the student's department, or None if unranked."""
+    entry = LeaderboardEntry.objects.filter(student=student).values("department", "total").first()
+    if entry is None:
+        return None
+    return _standing(entry, _department(entry).aggregate(**_rank_aggregates(entry)))
+
+
+async def astanding(student):
+    """standing() for async views."""
+    entry = await LeaderboardEntry.objects.filter(student=student).values("department", "total").afirst()
+    if entry is None:
+        return None
+    return _standing(entry, await _department(entry).aaggregate(**_rank_aggregates(entry)))
+
+
+def _department(entry):
+    return LeaderboardEntry.objects.filter(department=entry["department"])
+
+
+def _rank_aggregates(entry):
+    return {"ahead": Count("pk", filter=Q(total__gt=entry["total"])), "count": Count("pk")}
+
+
+def _standing(entry, counts):
+    rank = counts["ahead"] + 1
+    return {
+        "rank": rank,
+        "total": entry["total"],
+        "count": counts["count"],
+        "top_percent": max(1, round(100 * rank / counts["count"])),
+    }
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every total from Submission and return the number of ranked students."""
+    totals = dict(
+        Submission.objects.filter(faculty_marks__isnull=False)
+        .values_list("student_id")
+        .annotate(total=Sum("faculty_marks"))
+    )
+    departments = dict(Student.objects.filter(pk__in=totals).values_list("pk", "department"))
+    LeaderboardEntry.objects.all().delete()
+    LeaderboardEntry.objects.bulk_create(
+        [LeaderboardEntry(student_id=pk, department=departments[pk], total=total) for pk, total in totals.items()],
+        batch_size=1000,
+    )
+    return len(totals)
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+from adminui import benchmarking
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a class logging in at once: concurrent student logins against a throw-away "
+        "test database, while a bystander client keeps requesting a cheap page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=16, help="Concurrent login clients")
+        parser.add_argument("--logins", type=int, default=5, help="Logins per client")
+
+    def handle(self, *args, **options):
+        clients, logins = options["clients"], options["logins"]
+        self.stdout.write(
+            f"policy: {settings.PASSWORD_POLICY.get('student')}, "
+            f"hashing workers: {settings.PASSWORD_HASHING_WORKERS}"
+        )
+        with benchmarking.benchmark_database():
+            benchmarking.seed(students=clients * logins, submissions_per_student=0)
+            login_latencies, bystander_latencies, failures = [], [], []
+            done = threading.Event()
+
+            def login_worker(worker):
+                client = Client()
+                try:
+                    for n in range(logins):
+                        student_id = f"BENCH{worker * logins + n:06d}"
+                        start = time.perf_counter()
+                        response = client.post("/student/auth/", {
+                            "form_type": "login", "student_id": student_id, "password": benchmarking.PASSWORD,
+                        })
+                        login_latencies.append(time.perf_counter() - start)
+                        if response.status_code != 302:
+                            failures.append(student_id)
+                        client.cookies.clear()
+                finally:
+                    connection.close()
+
+            def bystander():
+                client = Client()
+                while not done.is_set():
+                    start = time.perf_counter()
+                    client.get("/")
+                    bystander_latencies.append(time.perf_counter() - start)
+                connection.close()
+
+            watcher = threading.Thread(target=bystander)
+            watcher.start()
+            workers = [threading.Thread(target=login_worker, args=(i,)) for i in range(clients)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            wall_time = time.perf_counter() - start
+            done.set()
+            watcher.join()
+
+        logins_summary = benchmarking.summarize(login_latencies, wall_time)
+        bystander_summary = benchmarking.summarize(bystander_latencies, wall_time)
+        self.stdout.write(f"logins:    {logins_summary}")
+        self.stdout.write(f"bystander: {bystander_summary}")
+        if failures:
+            self.stdout.write(self.style.ERROR(f"{len(failures)} logins failed"))
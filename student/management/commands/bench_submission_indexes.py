@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from student.models import Submission
+
+
+class Command(BaseCommand):
+    help = (
+        "Print query plans and timings for the Submission hot paths. "
+        "With --compare the new indexes are dropped temporarily to show the plans before and after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=50, help="Executions per query for timing")
+        parser.add_argument("--compare", action="store_true",
+                            help="Also measure without the Submission indexes (drops and re-creates them; "
+                                 "use on a benchmark database only)")
+
+    def handle(self, *args, **options):
+        sample = Submission.objects.order_by("-id").values("student_id", "problem_id").first()
+        sample = sample or {"student_id": 0, "problem_id": 0}
+        queries = {
+            "already submitted (submit_solution)": lambda: Submission.objects.filter(
+                student_id=sample["student_id"], problem_id=sample["problem_id"]),
+            "student history (student_dashboard)": lambda: Submission.objects.filter(
+                student_id=sample["student_id"]).order_by("-submitted_at")[:5],
+            "latest submissions (dashboards)": lambda: Submission.objects.order_by("-submitted_at", "-id")[:8],
+            "pending evaluation": lambda: Submission.objects.filter(
+                faculty_marks__isnull=True).order_by("submitted_at")[:10],
+        }
+        self.stdout.write(f"{Submission.objects.count()} submissions, {options['runs']} runs per query")
+
+        if options["compare"]:
+            self._drop_indexes()
+            try:
+                self._report("BEFORE (no Submission indexes)", queries, options["runs"])
+            finally:
+                self._restore_indexes()
+        self._report("AFTER (with Submission indexes)", queries, options["runs"])
+
+    def _report(self, title, queries, runs):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {title}"))
+        for name, build in queries.items():
+            start = time.perf_counter()
+            for _ in range(runs):
+                list(build())
+            elapsed_ms = (time.perf_counter() - start) * 1000 / runs
+            self.stdout.write(self.style.SUCCESS(f"\n{name}: {elapsed_ms:.3f} ms/query"))
+            self.stdout.write(build().explain())
+
+    def _drop_indexes(self):
+        meta = Submission._meta
+        with connection.schema_editor() as editor:
+            for constraint in meta.constraints:
+                editor.remove_constraint(Submission, constraint)
+            for index in meta.indexes:
+                editor.remove_index(Submission, index)
+
+    def _restore_indexes(self):
+        meta = Submission._meta
+        with connection.schema_editor() as editor:
+            for index in meta.indexes:
+                editor.add_index(Submission, index)
+            for constraint in meta.constraints:
+                editor.add_constraint(Submission, constraint)
@@ -0,0 +1,54 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from adminui import benchmarking
+from adminui.models import Problem
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure submission upload throughput through submit_solution, using a throw-away "
+        "test database and a temporary MEDIA_ROOT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1,10,50", help="Comma-separated file sizes in MB")
+        parser.add_argument("--repeat", type=int, default=3, help="Uploads per size")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        repeat = options["repeat"]
+        media_root = tempfile.mkdtemp(prefix="bench-media-")
+        results = []
+        try:
+            with override_settings(MEDIA_ROOT=media_root), benchmarking.benchmark_database():
+                benchmarking.seed(students=1, problems=0, faculty=0)
+                client = benchmarking.student_client()
+                for size in sizes:
+                    payload = os.urandom(1024 * 1024) * size
+                    timings = []
+                    for n in range(repeat):
+                        problem = Problem.objects.create(
+                            title=f"Upload {size} MB #{n}", description="bench", total_marks=10,
+                            max_upload_mb=size + 1, allowed_extensions="pdf",
+                        )
+                        upload = SimpleUploadedFile("solution.pdf", payload, content_type="application/pdf")
+                        start = time.perf_counter()
+                        response = client.post(f"/student/student/submit/{problem.id}/", {"file": upload})
+                        timings.append(time.perf_counter() - start)
+                        if b"submitted successfully" not in response.content:
+                            raise RuntimeError(f"Upload of {size} MB was not accepted")
+                    summary = benchmarking.summarize(timings)
+                    summary["size_mb"] = size
+                    summary["mb_per_s"] = round(size * len(timings) / sum(timings), 1)
+                    results.append(summary)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from student.models import Submission, SubmissionPreview
+from student.previews import build_preview
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and metadata for submissions that have none (or all, with --force)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild existing previews too")
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.order_by("id")
+        if not options["force"]:
+            submissions = submissions.exclude(preview__status=SubmissionPreview.READY)
+
+        counts = {SubmissionPreview.READY: 0, SubmissionPreview.FAILED: 0}
+        for submission_id in submissions.values_list("id", flat=True).iterator():
+            preview = build_preview(submission_id)
+            counts[preview.status] += 1
+            if preview.status == SubmissionPreview.FAILED:
+                self.stderr.write(f"submission {submission_id}: {preview.error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts[SubmissionPreview.READY]} previews built, {counts[SubmissionPreview.FAILED]} failed."
+        ))
@@ -0,0 +1,83 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from student.models import Submission
+from student.storage import BLOB_ROOT, blob_name, hash_file, submission_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing submission files into the content-addressed layout, merging identical "
+        "files into one blob, and optionally delete files no submission references."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without touching files")
+        parser.add_argument("--delete-orphans", action="store_true",
+                            help="Also delete files under submissions/ that no submission references")
+        parser.add_argument("--min-age", type=int, default=60,
+                            help="Minutes an unreferenced file must be untouched before it counts as orphaned "
+                                 "(a just-stored blob may belong to an upload whose row is not committed yet)")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        storage = submission_storage()
+        moved = {}  # old name -> blob name, for rows sharing one legacy file
+        blobs = set()
+        migrated = merged = missing = 0
+        reclaimed = 0
+
+        for submission in Submission.objects.only("id", "file", "original_name").iterator():
+            name = submission.file.name
+            if not name or name.startswith(BLOB_ROOT + "/"):
+                continue
+            if name not in moved:
+                path = storage.path(name)
+                if not os.path.exists(path):
+                    missing += 1
+                    self.stderr.write(f"missing file for submission {submission.id}: {name}")
+                    continue
+                with storage.open(name, "rb") as content:
+                    digest = hash_file(content)
+                target = blob_name(digest, os.path.splitext(name)[1])
+                if target in blobs or storage.exists(target):
+                    merged += 1
+                    reclaimed += os.path.getsize(path)
+                    if not dry_run:
+                        os.remove(path)
+                elif not dry_run:
+                    os.makedirs(os.path.dirname(storage.path(target)), exist_ok=True)
+                    os.replace(path, storage.path(target))
+                moved[name] = target
+                blobs.add(target)
+
+            migrated += 1
+            if not dry_run:
+                Submission.objects.filter(pk=submission.pk).update(
+                    file=moved[name],
+                    original_name=submission.original_name or os.path.basename(name),
+                )
+
+        orphans = 0
+        if options["delete_orphans"]:
+            cutoff = time.time() - options["min_age"] * 60
+            referenced = set(Submission.objects.values_list("file", flat=True)) | set(moved)
+            for directory, _, files in os.walk(storage.path("submissions")):
+                for filename in files:
+                    path = os.path.join(directory, filename)
+                    name = os.path.relpath(path, storage.location).replace(os.sep, "/")
+                    if name in referenced or os.path.getmtime(path) > cutoff:
+                        continue
+                    orphans += 1
+                    reclaimed += os.path.getsize(path)
+                    if not dry_run:
+                        os.remove(path)
+
+        prefix = "[dry run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{migrated} submissions migrated, {merged} duplicate files merged, "
+            f"{orphans} orphaned files removed, {missing} missing; "
+            f"{reclaimed / (1024 * 1024):.1f} MB reclaimed."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from student import leaderboard
+
+
+class Command(BaseCommand):
+    help = "Recompute every student's leaderboard total from evaluated submissions"
+
+    def handle(self, *args, **options):
+        ranked = leaderboard.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Ranked {ranked} students."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from student import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the student name/ID search index"
+
+    def handle(self, *args, **options):
+        total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} search terms."))
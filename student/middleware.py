@@ -0,0 +1,75 @@
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import cache
+from django.db import router
+from django.utils.functional import SimpleLazyObject
+
+from .models import Student
+
+IDENTITY_CACHE_TIMEOUT = 60
+# Only what the views read is cached; the password hash never leaves the database
+IDENTITY_FIELDS = ("id", "full_name", "student_id", "department")
+
+
+def _cache_key(pk):
+    return f"identity:student:{pk}"
+
+
+def _identity(obj):
+    return [getattr(obj, field) for field in IDENTITY_FIELDS]
+
+
+def _from_identity(values):
+    # Other fields are deferred: reading one loads it, and save() only writes the identity fields
+    return Student.from_db(router.db_for_read(Student), IDENTITY_FIELDS, values)
+
+
+def get_student(request):
+    pk = request.session.get("student_id")
+    if not pk:
+        return None
+    values = cache.get(_cache_key(pk))
+    if values is not None:
+        return _from_identity(values)
+    student = Student.objects.only(*IDENTITY_FIELDS).filter(pk=pk).first()
+    if student is not None:
+        cache.set(_cache_key(pk), _identity(student), IDENTITY_CACHE_TIMEOUT)
+    return student
+
+
+async def aget_student(request):
+    pk = await request.session.aget("student_id")
+    if not pk:
+        return None
+    values = await cache.aget(_cache_key(pk))
+    if values is not None:
+        return _from_identity(values)
+    student = await Student.objects.only(*IDENTITY_FIELDS).filter(pk=pk).afirst()
+    if student is not None:
+        await cache.aset(_cache_key(pk), _identity(student), IDENTITY_CACHE_TIMEOUT)
+    return student
+
+
+def forget_student(pk):
+    cache.delete(_cache_key(pk))
+
+
+class StudentMiddleware:
+    """
+    Attach the logged-in student as a lazy, briefly cached ``request.student``,
+    and ``await request.astudent()`` for async views.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.student = SimpleLazyObject(lambda: get_student(request))
+        request.astudent = partial(aget_student, request)
+        # In async mode this is the coroutine the handler awaits
+        return self.get_response(request)
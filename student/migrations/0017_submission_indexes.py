@@ -0,0 +1,70 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:18
+
+import sys
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remove_duplicate_submissions(apps, schema_editor):
+    """Keep one submission per (student, problem) so the unique constraint can be added.
+
+    The evaluated submission wins, otherwise the earliest one. Every removed
+    row is reported; its file stays on disk for "dedupe_submissions
+    --delete-orphans" to reclaim once nothing references it.
+    """
+    Submission = apps.get_model("student", "Submission")
+    duplicates = (
+        Submission.objects.values("student_id", "problem_id")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+    )
+    removed = []
+    for row in duplicates:
+        rows = Submission.objects.filter(student_id=row["student_id"], problem_id=row["problem_id"])
+        keep = (
+            rows.filter(faculty_marks__isnull=False).order_by("submitted_at", "id").first()
+            or rows.order_by("submitted_at", "id").first()
+        )
+        for extra in rows.exclude(pk=keep.pk).order_by("id"):
+            removed.append(
+                f"  submission {extra.pk} (student {extra.student_id}, problem {extra.problem_id}, "
+                f"marks {extra.faculty_marks}, file {extra.file}) duplicates kept submission {keep.pk}"
+            )
+            extra.delete()
+
+    if removed:
+        sys.stdout.write(
+            f"\n  Removed {len(removed)} duplicate submission(s) to add unique_student_problem_submission:\n"
+            + "\n".join(removed) + "\n"
+        )
+        EntityCount = apps.get_model("adminui", "EntityCount")
+        EntityCount.objects.filter(name="submission").update(total=Submission.objects.count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminui', '0007_entitycount'),
+        ('student', '0016_alter_submission_faculty'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', '-submitted_at'], name='submission_student_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['-submitted_at', '-id'], name='submission_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['faculty_marks', 'submitted_at'], name='submission_pending_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_submissions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='submission',
+            constraint=models.UniqueConstraint(fields=('student', 'problem'), name='unique_student_problem_submission'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:19
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_students(apps, schema_editor):
+    Student = apps.get_model("student", "Student")
+    StudentSearchTerm = apps.get_model("student", "StudentSearchTerm")
+    terms = []
+    for student in Student.objects.only("id", "full_name", "student_id").iterator():
+        words = set(re.findall(r"\w+", (student.full_name or "").lower()))
+        words.add(student.student_id.lower())
+        terms.extend(StudentSearchTerm(student_id=student.id, term=word[:100]) for word in words)
+    StudentSearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0017_submission_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='student.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'student'], name='student_search_term_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_students, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:24
+
+import os
+
+import student.storage
+from django.db import migrations, models
+
+
+def fill_original_names(apps, schema_editor):
+    Submission = apps.get_model("student", "Submission")
+    for submission in Submission.objects.filter(original_name="").only("id", "file").iterator():
+        Submission.objects.filter(pk=submission.pk).update(original_name=os.path.basename(submission.file.name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0018_studentsearchterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='file',
+            field=models.FileField(storage=student.storage.submission_storage, upload_to='submissions/'),
+        ),
+        migrations.RunPython(fill_original_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0019_submission_content_addressed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionPreview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('image', models.FileField(blank=True, upload_to='previews/')),
+                ('mime_type', models.CharField(blank=True, max_length=100)),
+                ('size_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='preview', to='student.submission')),
+            ],
+        ),
+    ]
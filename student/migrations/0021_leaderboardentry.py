@@ -0,0 +1,26 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0020_submissionpreview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=50)),
+                ('total', models.BigIntegerField(default=0)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to='student.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['department', 'total'], name='leaderboard_rank_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+import re
+
+from django.db import migrations
+
+
+def reindex_multiword_ids(apps, schema_editor):
+    """IDs such as CS-2021-007 were indexed as one term; search now splits them into words."""
+    Student = apps.get_model("student", "Student")
+    StudentSearchTerm = apps.get_model("student", "StudentSearchTerm")
+    terms = []
+    for student in Student.objects.only("id", "full_name", "student_id").iterator():
+        id_words = re.findall(r"\w+", student.student_id.lower())
+        if id_words == [student.student_id.lower()]:
+            continue  # a single word: indexed the same way before
+        StudentSearchTerm.objects.filter(student_id=student.id).delete()
+        words = set(re.findall(r"\w+", (student.full_name or "").lower())) | set(id_words)
+        terms.extend(StudentSearchTerm(student_id=student.id, term=word[:100]) for word in words)
+    StudentSearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0021_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_multiword_ids, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,6 @@
 # student/models.py
 from django.db import models
-from django.contrib.auth.hashers import make_password, check_password
+from adminui.passwords import hash_password, verify_password
 
 class Student(models.Model):
     full_name = models.CharField(max_length=100)
@@ -13,20 +13,22 @@ class Student(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def set_password(self, raw_password):
-        self.password = make_password(raw_password)
+        self.password = hash_password("student", raw_password)
 
     def check_password(self, raw_password):
-        return check_password(raw_password, self.password)
+        return verify_password("student", raw_password, self)
 
     def __str__(self):
         return self.student_id
 from adminui.models import Problem,Faculty
+from .storage import submission_storage
 
 
 class Submission(models.Model):
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name="submissions")
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    file = models.FileField(upload_to="submissions/")
+    file = models.FileField(upload_to="submissions/", storage=submission_storage)
+    original_name = models.CharField(max_length=255, blank=True)  # the student's file name; file holds the blob path
     submitted_at = models.DateTimeField(auto_now_add=True)
 
     # Link evaluation to Faculty, not admin User
@@ -40,6 +42,67 @@ class Submission(models.Model):
     faculty_marks = models.IntegerField(null=True, blank=True)
     faculty_remarks = models.TextField(blank=True)
 
+    class Meta:
+        constraints = [
+            # One submission per student per problem, enforced by the database
+            models.UniqueConstraint(fields=["student", "problem"], name="unique_student_problem_submission"),
+        ]
+        indexes = [
+            models.Index(fields=["student", "-submitted_at"], name="submission_student_recent_idx"),
+            models.Index(fields=["-submitted_at", "-id"], name="submission_recent_idx"),
+            # MySQL has no partial indexes; faculty_marks IS NULL is a ref lookup on this prefix
+            models.Index(fields=["faculty_marks", "submitted_at"], name="submission_pending_idx"),
+        ]
+
     def __str__(self):
         faculty_display = self.faculty.username if self.faculty else "Not Evaluated"
         return f"{self.student.full_name} - {self.problem.title} (Evaluated by: {faculty_display})"
+
+
+class StudentSearchTerm(models.Model):
+    """One lower-cased word of a student's name or ID, for indexed prefix search."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="search_terms")
+    term = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["term", "student"], name="student_search_term_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.student_id}"
+
+
+class SubmissionPreview(models.Model):
+    """First-page thumbnail and basic metadata, filled in by student.previews."""
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (READY, "Ready"), (FAILED, "Failed")]
+
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, related_name="preview")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    image = models.FileField(upload_to="previews/", blank=True)
+    mime_type = models.CharField(max_length=100, blank=True)
+    size_bytes = models.BigIntegerField(null=True, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Preview of submission {self.submission_id} ({self.status})"
+
+
+class LeaderboardEntry(models.Model):
+    """A student's running marks total, kept current by student.leaderboard."""
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, related_name="leaderboard_entry")
+    department = models.CharField(max_length=50)  # copied from Student so rank is one index range
+    total = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["department", "total"], name="leaderboard_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id}: {self.total}"
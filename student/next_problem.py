@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+from adminui.models import Problem
+from .models import Submission
+
+CACHE_TIMEOUT = 60 * 60
+VERSION_KEY = "next_problem:version"
+_MISSING = object()
+
+
+def _problems_version():
+    # Adding or deleting a problem bumps this, which retires every cached answer at once
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def _cache_key(student_id, version=None):
+    return f"next_problem:{version or _problems_version()}:{student_id}"
+
+
+def get_next_problem(student_id):
+    """Oldest problem the student has not submitted yet, or None."""
+    key = _cache_key(student_id)
+    problem = cache.get(key, _MISSING)
+    if problem is _MISSING:
+        problem = _next_problem_query(student_id).first()
+        cache.set(key, problem, CACHE_TIMEOUT)
+    return problem
+
+
+async def aget_next_problem(student_id):
+    """get_next_problem() for async views."""
+    key = _cache_key(student_id, await cache.aget_or_set(VERSION_KEY, 1, None))
+    problem = await cache.aget(key, _MISSING)
+    if problem is _MISSING:
+        problem = await _next_problem_query(student_id).afirst()
+        await cache.aset(key, problem, CACHE_TIMEOUT)
+    return problem
+
+
+def _next_problem_query(student_id):
+    submitted = Submission.objects.filter(student_id=student_id, problem=OuterRef("pk"))
+    return Problem.objects.filter(~Exists(submitted)).order_by("created_at", "id")
+
+
+def forget_student(student_id):
+    cache.delete(_cache_key(student_id))
+
+
+def forget_all():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
@@ -0,0 +1,145 @@
+"""
+Thumbnail and metadata extraction for new submissions.
+
+Runs on a small background thread pool after the submission is committed,
+so uploads never wait for it. Rendering uses whatever is installed:
+PyMuPDF (``fitz``) or poppler's ``pdftoppm`` for PDFs, Pillow for images,
+and the thumbnail Office embeds in .pptx/.pptm/.docx files. Without them a
+preview still records MIME type, size and page count.
+"""
+
+import io
+import logging
+import mimetypes
+import re
+import shutil
+import subprocess
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+
+from .models import Submission, SubmissionPreview
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 320
+OFFICE_EXTENSIONS = {".pptx", ".pptm", ".ppsx", ".docx", ".docm", ".xlsx", ".xlsm"}
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=getattr(settings, "PREVIEW_WORKERS", 2),
+                                       thread_name_prefix="preview")
+    return _executor
+
+
+def schedule(submission_id):
+    """Queue a preview for ``submission_id`` once the current transaction commits."""
+    if getattr(settings, "PREVIEW_WORKERS", 2) <= 0:
+        return  # disabled; build_previews can fill them in later
+    transaction.on_commit(lambda: _get_executor().submit(_run, submission_id))
+
+
+def _run(submission_id):
+    close_old_connections()
+    try:
+        build_preview(submission_id)
+    except Exception:
+        logger.exception("Preview generation failed for submission %s", submission_id)
+    finally:
+        close_old_connections()
+
+
+def _png_thumbnail(image_bytes):
+    if Image is None:
+        return None
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        output = io.BytesIO()
+        image.convert("RGB").save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+
+def _pdf_preview(path):
+    """Return (png bytes or None, page count or None) for a PDF."""
+    if fitz is not None:
+        with fitz.open(path) as document:
+            page = document[0]
+            zoom = THUMBNAIL_SIZE / max(page.rect.width, page.rect.height)
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            return pixmap.tobytes("png"), document.page_count
+
+    # Rough count without a PDF library: page objects, not the /Pages tree nodes
+    with open(path, "rb") as handle:
+        page_count = len(re.findall(rb"/Type\s*/Page(?![a-zA-Z])", handle.read())) or None
+    image = None
+    if shutil.which("pdftoppm"):
+        result = subprocess.run(
+            ["pdftoppm", "-png", "-f", "1", "-l", "1", "-scale-to", str(THUMBNAIL_SIZE), path],
+            capture_output=True, timeout=30,
+        )
+        if result.returncode == 0 and result.stdout:
+            image = result.stdout
+    return image, page_count
+
+
+def _office_preview(path):
+    """Office Open XML files are zips; slides are counted, the embedded thumbnail reused."""
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        slides = [name for name in names if re.fullmatch(r"ppt/slides/slide\d+\.xml", name)]
+        thumbnail = next((name for name in names if name.lower().startswith("docprops/thumbnail")), None)
+        image = archive.read(thumbnail) if thumbnail else None
+    if image is not None:
+        image = _png_thumbnail(image) or (image if thumbnail.lower().endswith(".png") else None)
+    return image, len(slides) or None
+
+
+def build_preview(submission_id):
+    submission = Submission.objects.get(pk=submission_id)
+    preview, _ = SubmissionPreview.objects.get_or_create(submission=submission)
+    name = submission.original_name or submission.file.name
+    extension = ("." + name.rsplit(".", 1)[-1].lower()) if "." in name else ""
+
+    try:
+        path = submission.file.path
+        preview.size_bytes = submission.file.size
+        preview.mime_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        image, page_count = None, None
+        if preview.mime_type == "application/pdf":
+            image, page_count = _pdf_preview(path)
+        elif preview.mime_type.startswith("image/"):
+            with open(path, "rb") as handle:
+                image = _png_thumbnail(handle.read())
+            page_count = 1
+        elif extension in OFFICE_EXTENSIONS and zipfile.is_zipfile(path):
+            image, page_count = _office_preview(path)
+
+        preview.page_count = page_count
+        if image:
+            if preview.image:
+                preview.image.delete(save=False)
+            preview.image.save(f"{submission.pk}.png", ContentFile(image), save=False)
+        preview.status = SubmissionPreview.READY
+        preview.error = ""
+    except Exception as exc:
+        preview.status = SubmissionPreview.FAILED
+        preview.error = str(exc)[:255]
+    preview.save()
+    return preview
@@ -0,0 +1,105 @@
+import re
+
+from django.db.models import Case, IntegerField, Max, Q, Value, When
+
+from .models import Student, StudentSearchTerm
+
+MAX_RESULTS = 200
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased words of ``text``; used for both index terms and queries so they always line up."""
+    return _WORD_RE.findall((text or "").lower())
+
+
+def terms_for(full_name, student_id):
+    """Index terms for a student: every word of the name and of the ID (``CS-2021`` gives cs, 2021)."""
+    return {term[:100] for term in tokenize(full_name) + tokenize(student_id)}
+
+
+def parse_query(query):
+    """Split a search box value into prefixes; a trailing * is accepted (``201AU1*``)."""
+    return tokenize(query)[:5]
+
+
+def index_student(student):
+    StudentSearchTerm.objects.filter(student=student).delete()
+    StudentSearchTerm.objects.bulk_create(
+        StudentSearchTerm(student=student, term=term)
+        for term in terms_for(student.full_name, student.student_id)
+    )
+
+
+def index_students(students):
+    """Index many students at once (for bulk inserts, which skip post_save)."""
+    students = list(students)
+    StudentSearchTerm.objects.filter(student__in=students).delete()
+    StudentSearchTerm.objects.bulk_create(
+        [StudentSearchTerm(student=student, term=term)
+         for student in students
+         for term in terms_for(student.full_name, student.student_id)],
+        batch_size=1000,
+    )
+
+
+def rebuild_index(batch_size=1000):
+    StudentSearchTerm.objects.all().delete()
+    batch = []
+    total = 0
+    for student in Student.objects.only("id", "full_name", "student_id").iterator(chunk_size=batch_size):
+        batch.extend(
+            StudentSearchTerm(student_id=student.id, term=term)
+            for term in terms_for(student.full_name, student.student_id)
+        )
+        if len(batch) >= batch_size:
+            StudentSearchTerm.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    StudentSearchTerm.objects.bulk_create(batch)
+    return total + len(batch)
+
+
+async def asearch_students(query, limit=MAX_RESULTS):
+    """
+    Return ids of students matching every word of ``query`` as a prefix,
+    best first: exact word/ID matches rank above prefix matches.
+
+    Capped at ``limit`` for ranked display; filter with matching_students().
+    """
+    rows = _ranked_ids(query, limit)
+    return [pk async for pk in rows] if rows is not None else []
+
+
+def matching_students(query):
+    """Unranked, uncapped subquery of matching student ids, for ``student_id__in=...`` filters."""
+    tokens = parse_query(query)
+    if not tokens:
+        return StudentSearchTerm.objects.none().values("student_id")
+    return _matches(tokens).values("student_id")
+
+
+def _matches(tokens):
+    prefix_filter = Q()
+    hits = exact = Value(0)
+    # Terms and tokens are both lower-cased, so a case-sensitive prefix match is enough
+    for token in tokens:
+        prefix_filter |= Q(term__startswith=token)
+        hits = hits + Max(Case(When(term__startswith=token, then=Value(1)), default=Value(0),
+                               output_field=IntegerField()))
+        exact = exact + Max(Case(When(term=token, then=Value(1)), default=Value(0),
+                                 output_field=IntegerField()))
+
+    return (
+        StudentSearchTerm.objects.filter(prefix_filter)
+        .values("student_id")
+        .annotate(hits=hits, exact=exact)
+        .filter(hits=len(tokens))
+    )
+
+
+def _ranked_ids(query, limit):
+    tokens = parse_query(query)
+    if not tokens:
+        return None
+    return _matches(tokens).order_by("-exact", "student_id").values_list("student_id", flat=True)[:limit]
@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from adminui.models import Problem
+from adminui.signals import CASCADING_MODELS, deleted_through
+from faculty.signals import submission_evaluated, submissions_evaluated
+from . import leaderboard, next_problem, previews, search
+from .middleware import forget_student
+from .models import Student, Submission
+
+
+@receiver(post_save, sender=Submission)
+def submission_saved(sender, instance, created, **kwargs):
+    if created:
+        next_problem.forget_student(instance.student_id)
+        previews.schedule(instance.pk)
+
+
+@receiver(post_delete, sender=Submission)
+def submission_deleted(sender, instance, origin=None, **kwargs):
+    next_problem.forget_student(instance.student_id)
+    # A deleted student's entry cascades with it; a deleted problem is handled in problem_deleting
+    if deleted_through(origin) not in CASCADING_MODELS:
+        leaderboard.submission_removed(instance)
+
+
+@receiver(pre_delete, sender=Problem)
+def problem_deleting(sender, instance, **kwargs):
+    leaderboard.submissions_removed(instance.submissions.all())
+
+
+@receiver(submission_evaluated)
+def submission_graded(sender, submission, previous_marks, **kwargs):
+    leaderboard.marks_changed(submission, previous_marks)
+
+
+@receiver(submissions_evaluated)
+def submissions_graded(sender, changes, **kwargs):
+    leaderboard.marks_changed_many(changes)
+
+
+@receiver([post_save, post_delete], sender=Problem)
+def problem_changed(sender, instance, **kwargs):
+    next_problem.forget_all()
+
+
+# What the search index and the leaderboard are built from
+INDEXED_FIELDS = {"full_name", "student_id", "department"}
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return  # e.g. the password rehash on login
+    search.index_student(instance)
+    if not created:
+        leaderboard.move_student(instance)
+    forget_student(instance.pk)
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    forget_student(instance.pk)
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+BLOB_ROOT = "submissions/sha256"
+
+
+def blob_name(digest, extension=""):
+    """Sharded path for a blob, e.g. submissions/sha256/ab/cd/abcd...ef.pdf"""
+    return f"{BLOB_ROOT}/{digest[:2]}/{digest[2:4]}/{digest}{extension[:10].lower()}"
+
+
+def hash_file(content):
+    sha256 = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return sha256.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Store every distinct file once, named by its SHA-256.
+
+    Identical uploads resolve to the same blob, so several submissions can
+    reference one file on disk. Writes land in place with a rename; two
+    concurrent writers of the same blob write identical bytes, so the race
+    is harmless.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name  # names are content hashes, collisions mean "already stored"
+
+    def _save(self, name, content):
+        digest = getattr(content, "sha256", None) or hash_file(content)
+        name = blob_name(digest, os.path.splitext(name)[1])
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            return name
+
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        if hasattr(content, "temporary_file_path"):
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as tmp:
+                    for chunk in content.chunks():
+                        tmp.write(chunk)
+                os.replace(tmp_path, full_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+
+def submission_storage():
+    return ContentAddressedStorage()
@@ -1,3 +1,391 @@
-from django.test import TestCase
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import AsyncClient, TestCase, override_settings
+
+from adminui import api
+from adminui.models import Faculty, Problem
+from . import downloads, leaderboard, middleware, next_problem, search, signals
+from .models import LeaderboardEntry, Student, Submission, SubmissionPreview
+from .storage import BLOB_ROOT
+
+
+def make_student(student_id="STU1", department="CSE"):
+    return Student.objects.create(full_name=f"Student {student_id}", student_id=student_id, password="x",
+                                  gender="other", year=1, semester=1, department=department)
+
+
+class MediaTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix="test-media-")
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, PREVIEW_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = media_root
+
+    def login_student(self, student):
+        session = self.client.session
+        session["student_id"] = student.pk
+        session.save()
+
+
+# ----- Submitting -----
+
+class SubmitSolutionTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = make_student()
+        self.problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        self.login_student(self.student)
+
+    def lose_race(self, submission, *args, **kwargs):
+        # What a concurrent winner looks like: the blob is stored, then the insert hits the constraint
+        submission.file.save(submission.file.name, submission.file.file, save=False)
+        raise IntegrityError("unique_student_problem_submission")
+
+    def submit(self, content):
+        with mock.patch.object(Submission, "save", autospec=True, side_effect=self.lose_race):
+            return self.client.post(f"/student/student/submit/{self.problem.pk}/",
+                                    {"file": SimpleUploadedFile("a.pdf", content)})
+
+    def blobs(self):
+        return [name for _, _, names in os.walk(self.media_root) for name in names if name.endswith(".pdf")]
+
+    def test_lost_race_leaves_blob_for_the_orphan_sweep(self):
+        response = self.submit(b"%PDF-1.4 mine")
+        self.assertContains(response, "already submitted")
+        [blob] = self.blobs()  # an identical upload may still be committing a row that points here
+
+        call_command("dedupe_submissions", delete_orphans=True, stdout=io.StringIO())
+        self.assertEqual(len(self.blobs()), 1)  # too fresh to sweep
+        call_command("dedupe_submissions", delete_orphans=True, min_age=0, stdout=io.StringIO())
+        self.assertEqual(self.blobs(), [])
+
+    def test_sweep_keeps_referenced_blobs(self):
+        other = Submission.objects.create(problem=self.problem, student=make_student("STU2"),
+                                          file=SimpleUploadedFile("b.pdf", b"%PDF-1.4 same"))
+        self.submit(b"%PDF-1.4 same")
+        call_command("dedupe_submissions", delete_orphans=True, min_age=0, stdout=io.StringIO())
+        self.assertTrue(other.file.storage.exists(other.file.name))
+
+
+# ----- Content-addressed storage -----
+
+class ContentAddressedStorageTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+
+    def submit(self, student_id, name, content):
+        return Submission.objects.create(problem=self.problem, student=make_student(student_id),
+                                         file=SimpleUploadedFile(name, content))
+
+    def legacy(self, student_id, name, content):
+        path = os.path.join(self.media_root, "submissions", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return Submission.objects.create(problem=self.problem, student=make_student(student_id),
+                                         file=f"submissions/{name}")
+
+    def test_identical_uploads_share_one_sharded_blob(self):
+        first = self.submit("S1", "201AU116.pdf", b"%PDF-1.4 same")
+        second = self.submit("S2", "other.PDF", b"%PDF-1.4 same")
+        third = self.submit("S3", "201AU116.pdf", b"%PDF-1.4 different")
+        self.assertEqual(first.file.name, second.file.name)  # extensions are normalised too
+        self.assertRegex(first.file.name, rf"^{BLOB_ROOT}/([0-9a-f]{{2}})/([0-9a-f]{{2}})/\1\2[0-9a-f]{{60}}\.pdf$")
+        self.assertNotEqual(first.file.name, third.file.name)
+        with first.file.open("rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 same")
+
+    def test_command_merges_legacy_duplicates(self):
+        rows = [self.legacy("S1", "201AU116.pdf", b"%PDF-1.4 same"),
+                self.legacy("S2", "201AU116_YmWhe9y.pdf", b"%PDF-1.4 same")]
+        out = io.StringIO()
+        call_command("dedupe_submissions", dry_run=True, stdout=out)
+        self.assertIn("1 duplicate files merged", out.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, "submissions", "201AU116.pdf")))
+
+        call_command("dedupe_submissions", stdout=io.StringIO())
+        for row in rows:
+            row.refresh_from_db()
+        self.assertEqual(rows[0].file.name, rows[1].file.name)
+        self.assertTrue(rows[0].file.name.startswith(BLOB_ROOT + "/"))
+        self.assertEqual([row.original_name for row in rows], ["201AU116.pdf", "201AU116_YmWhe9y.pdf"])
+        legacy_left = [name for name in os.listdir(os.path.join(self.media_root, "submissions")) if name != "sha256"]
+        self.assertEqual(legacy_left, [])
+
+
+# ----- Identity cache -----
+
+class IdentityCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.student = make_student()
+        session = self.client.session
+        session["student_id"] = self.student.pk
+        session.save()
+
+    def test_cache_holds_identity_fields_only(self):
+        self.assertEqual(self.client.get("/student/student/").status_code, 200)
+        cached = cache.get(middleware._cache_key(self.student.pk))
+        self.assertEqual(cached, [self.student.pk, self.student.full_name, "STU1", "CSE"])
+
+    def test_cached_student_works_as_a_model_instance(self):
+        request = mock.Mock(session={"student_id": self.student.pk})
+        middleware.get_student(request)
+        with self.assertNumQueries(0):
+            student = middleware.get_student(request)
+            self.assertEqual((student.pk, student.student_id), (self.student.pk, "STU1"))
+        self.assertEqual(Submission.objects.filter(student=student).count(), 0)
+        self.assertEqual(student.password, "x")  # deferred, loaded on demand
+        student.full_name = "Renamed"
+        student.save()
+        self.student.refresh_from_db()
+        self.assertEqual((self.student.full_name, self.student.password, self.student.year), ("Renamed", "x", 1))
+
+
+# ----- Password policy -----
+
+@override_settings(PASSWORD_POLICY={"student": {"algorithm": "pbkdf2_sha256", "iterations": 2000}})
+class PasswordPolicyTests(TestCase):
+    def login(self, stored_hash):
+        student = make_student()
+        Student.objects.filter(pk=student.pk).update(password=stored_hash)
+        with mock.patch.object(signals.search, "index_student") as index, \
+                mock.patch.object(signals.leaderboard, "move_student") as move:
+            response = self.client.post("/student/auth/", {"form_type": "login", "student_id": "STU1",
+                                                            "password": "secret"})
+        self.assertEqual(response.status_code, 302)
+        index.assert_not_called()  # a password-only save leaves search and the leaderboard alone
+        move.assert_not_called()
+        student.refresh_from_db()
+        return student.password
+
+    def test_cheaper_hash_is_upgraded_on_login(self):
+        cheaper = PBKDF2PasswordHasher()
+        cheaper.iterations = 1000
+        self.assertTrue(self.login(make_password("secret", hasher=cheaper)).startswith("pbkdf2_sha256$2000$"))
+
+    def test_costlier_hash_is_not_weakened(self):
+        stronger = make_password("secret", hasher="pbkdf2_sha256")  # Django's default iterations
+        self.assertEqual(self.login(stronger), stronger)
+
+
+# ----- Next problem -----
+
+class NextProblemTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.student = make_student()
+        self.problems = [Problem.objects.create(title=f"P{i}", description="d", total_marks=10) for i in range(2)]
+
+    def submit(self, problem):
+        Submission.objects.create(problem=problem, student=self.student, file=f"submissions/{problem.pk}.pdf")
+
+    def test_oldest_unsubmitted_problem_then_none(self):
+        self.assertEqual(next_problem.get_next_problem(self.student.pk), self.problems[0])
+        self.submit(self.problems[0])
+        self.assertEqual(next_problem.get_next_problem(self.student.pk), self.problems[1])
+        self.submit(self.problems[1])
+        self.assertIsNone(next_problem.get_next_problem(self.student.pk))
+
+    def test_answer_is_cached_including_none(self):
+        for problem in self.problems:
+            self.submit(problem)
+        next_problem.get_next_problem(self.student.pk)
+        with self.assertNumQueries(0):
+            self.assertIsNone(next_problem.get_next_problem(self.student.pk))
+
+    def test_new_problem_retires_cached_answers(self):
+        for problem in self.problems:
+            self.submit(problem)
+        self.assertIsNone(next_problem.get_next_problem(self.student.pk))
+        added = Problem.objects.create(title="P2", description="d", total_marks=10)
+        self.assertEqual(next_problem.get_next_problem(self.student.pk), added)
+
+    async def test_async_lookup_matches(self):
+        self.assertEqual(await next_problem.aget_next_problem(self.student.pk), self.problems[0])
+
+
+# ----- Template fragments -----
+
+class ProblemDescriptionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.student = make_student()
+        self.problem = Problem.objects.create(title="P1", description="Sort the list.", total_marks=10)
+        session = self.client.session
+        session["student_id"] = self.student.pk
+        session.save()
+
+    def test_cached_description_is_replaced_when_the_problem_is_saved(self):
+        self.assertContains(self.client.get("/student/student/"), "Sort the list.")
+        Problem.objects.filter(pk=self.problem.pk).update(description="Reverse the list.")
+        self.assertContains(self.client.get("/student/student/"), "Sort the list.")  # served from the fragment cache
+
+        self.problem.description = "Reverse the list."
+        self.problem.save()
+        response = self.client.get("/student/student/")
+        self.assertContains(response, "Reverse the list.")
+        self.assertNotContains(response, "Sort the list.")
+
+
+# ----- Search -----
+
+class StudentSearchTests(TestCase):
+    def setUp(self):
+        self.students = [make_student(f"201AU{i:03d}") for i in range(5)]  # indexed by the post_save signal
+
+    async def test_ranked_search_is_capped(self):
+        self.assertEqual(len(await search.asearch_students("201au", limit=3)), 3)
+
+    def test_filter_is_not_capped(self):
+        subquery = search.matching_students("201au")
+        self.assertNotIn("LIMIT", str(subquery.query))
+        self.assertEqual(Student.objects.filter(pk__in=subquery).count(), 5)
+        self.assertEqual(len(api.page("students", {"q": "201au", "limit": "10"})["results"]), 5)
+
+    async def test_hyphenated_id_is_found(self):
+        hyphenated = await sync_to_async(make_student)("CS-2021-007")
+        self.assertEqual(await search.asearch_students("CS-2021-007"), [hyphenated.pk])
+        self.assertEqual(await search.asearch_students("cs-2021"), [hyphenated.pk])
+        self.assertEqual([s async for s in Student.objects.filter(pk__in=search.matching_students("CS-2021"))],
+                         [hyphenated])
+
+    async def test_exact_words_rank_first(self):
+        exact = await sync_to_async(make_student)("201AU")
+        self.assertEqual((await search.asearch_students("201au"))[0], exact.pk)
+
+    def test_filter_without_words_matches_nothing(self):
+        self.assertFalse(Student.objects.filter(pk__in=search.matching_students("***")).exists())
+
+
+# ----- Downloads -----
+
+class DownloadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = make_student()
+        problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        self.submission = Submission.objects.create(problem=problem, student=self.student, original_name="a.pdf",
+                                                    file=SimpleUploadedFile("a.pdf", b"%PDF-1.4 body"))
+        self.url = f"/student/submission/{self.submission.pk}/file/"
+        self.login_student(self.student)
+
+    def test_not_modified_keeps_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        b"".join(response.streaming_content)
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        for header in ("ETag", "Last-Modified", "Cache-Control"):
+            self.assertEqual(not_modified[header], response[header])
+
+    async def test_async_download_stats_the_file_off_the_event_loop(self):
+        real_stat = os.stat
+        on_event_loop = []
+
+        def stat(path, *args, **kwargs):
+            if str(path).endswith(".pdf"):
+                try:
+                    asyncio.get_running_loop()
+                    on_event_loop.append(True)
+                except RuntimeError:
+                    on_event_loop.append(False)
+            return real_stat(path, *args, **kwargs)
+
+        client = AsyncClient()
+        client.cookies = self.client.cookies
+        with mock.patch.object(downloads.os, "stat", side_effect=stat):
+            response = await client.get(self.url)
+            body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual((response.status_code, body), (200, b"%PDF-1.4 body"))
+        self.assertEqual(on_event_loop, [False])
+
+    def test_preview_is_revalidated_not_refetched(self):
+        preview = SubmissionPreview.objects.create(submission=self.submission, status=SubmissionPreview.READY,
+                                                   image=SimpleUploadedFile("p.png", b"\x89PNG thumb"))
+        response = self.client.get(f"/student/submission/{self.submission.pk}/preview/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("no-store", response["Cache-Control"])
+        not_modified = self.client.get(f"/student/submission/{self.submission.pk}/preview/",
+                                       HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertTrue(preview.image.storage.exists(preview.image.name))
+
+
+# ----- Leaderboard -----
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title="P1", description="d", total_marks=10)
+        self.faculty = Faculty.objects.create(username="fac", password="x", faculty_id="FAC1", gender="other",
+                                              department="CSE")
+        session = self.client.session
+        session["faculty_id"] = self.faculty.faculty_id
+        session.save()
+
+    def evaluate(self, student, marks, problem=None):
+        problem = problem or self.problem
+        submission = Submission.objects.create(problem=problem, student=student,
+                                               file=f"submissions/{problem.pk}-{student.pk}.pdf")
+        response = self.client.post(f"/faculty/evaluate/{submission.pk}/", {"marks": str(marks), "remarks": ""})
+        self.assertEqual(response.status_code, 302)
+        submission.refresh_from_db()
+        return submission
+
+    def assertMatchesRebuild(self):
+        incremental = dict(LeaderboardEntry.objects.values_list("student_id", "total"))
+        leaderboard.rebuild()
+        self.assertEqual(dict(LeaderboardEntry.objects.values_list("student_id", "total")), incremental)
+
+    def test_first_grade_of_zero_is_ranked(self):
+        scorer, zero = make_student("S1"), make_student("S2")
+        self.evaluate(scorer, 7)
+        self.evaluate(zero, 0)
+
+        self.assertEqual(leaderboard.standing(zero), {"rank": 2, "total": 0, "count": 2, "top_percent": 100})
+        self.assertEqual(leaderboard.standing(scorer)["count"], 2)
+
+    def test_incremental_totals_match_rebuild(self):
+        students = [make_student(f"S{i}") for i in range(3)]
+        for student, marks in zip(students, (0, 4, 9)):
+            self.evaluate(student, marks)
+        incremental = [leaderboard.standing(student) for student in students]
+        leaderboard.rebuild()
+        self.assertEqual([leaderboard.standing(student) for student in students], incremental)
+
+    def test_deleting_graded_submissions_matches_rebuild(self):
+        zero, scorer, twice = make_student("S1"), make_student("S2"), make_student("S3")
+        other = Problem.objects.create(title="P2", description="d", total_marks=10)
+        self.evaluate(zero, 0).delete()  # the only graded submission: the entry goes
+        self.evaluate(scorer, 6).delete()
+        self.evaluate(twice, 4)
+        self.evaluate(twice, 5, problem=other).delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(list(LeaderboardEntry.objects.values_list("student_id", "total")), [(twice.pk, 4)])
+
+    def test_deleting_a_problem_matches_rebuild(self):
+        only_here, elsewhere = make_student("S1"), make_student("S2")
+        other = Problem.objects.create(title="P2", description="d", total_marks=10)
+        self.evaluate(only_here, 7, problem=other)
+        self.evaluate(elsewhere, 3, problem=other)
+        self.evaluate(elsewhere, 2)
+        other.delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(list(LeaderboardEntry.objects.values_list("student_id", "total")), [(elsewhere.pk, 2)])
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, TemporaryFileUploadHandler
+
+# Multipart boundaries and the other form fields ride along with the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def incoming_dir():
+    """Temporary upload directory on the same filesystem as MEDIA_ROOT."""
+    path = os.path.join(settings.MEDIA_ROOT, "tmp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class IncomingFile(TemporaryUploadedFile):
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix=".upload" + ext, dir=incoming_dir())
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+
+
+class SubmissionUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream a submission straight to a temporary file under MEDIA_ROOT,
+    enforcing the problem's size and type limits as data arrives.
+
+    A rejected file is skipped: the rest of its body is read and discarded
+    without being buffered, and ``request.upload_error`` explains why. The
+    temporary file lives on the same filesystem as the media directory, so
+    the storage finalizes it with an atomic rename rather than a copy.
+    """
+
+    def __init__(self, request, problem):
+        super().__init__(request)
+        self.problem = problem
+        self.max_bytes = problem.max_upload_mb * 1024 * 1024
+        self.declared_too_large = False
+        self.received = 0
+        self.request.upload_error = ""
+
+    def _reject(self, message):
+        self.request.upload_error = message
+        raise SkipFile()
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.declared_too_large = content_length > self.max_bytes + MULTIPART_OVERHEAD
+        return None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        if self.declared_too_large:
+            self._reject(f"File exceeds the {self.problem.max_upload_mb} MB limit for this problem.")
+        allowed = self.problem.extension_list()
+        extension = os.path.splitext(file_name or "")[1].lower().lstrip(".")
+        if allowed and extension not in allowed:
+            self._reject("Only " + ", ".join(f".{ext}" for ext in allowed) + " files are accepted for this problem.")
+        self.received = 0
+        self.sha256 = hashlib.sha256()
+        FileUploadHandler.new_file(self, field_name, file_name, *args, **kwargs)
+        self.file = IncomingFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self._reject(f"File exceeds the {self.problem.max_upload_mb} MB limit for this problem.")
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()  # lets the content-addressed storage skip re-reading it
+        return file
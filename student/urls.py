@@ -6,4 +6,6 @@ urlpatterns = [
     path("student/", views.student_dashboard, name="student_dashboard"),
     path("student/submit/<int:problem_id>/", views.submit_solution, name="submit_solution"),
     path("student/logout/", views.student_logout, name="student_logout"),  # add logout
+    path("submission/<int:submission_id>/file/", views.download_submission, name="download_submission"),
+    path("submission/<int:submission_id>/preview/", views.submission_preview, name="submission_preview"),
 ]
@@ -1,11 +1,20 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib import messages
-from django.contrib.auth.hashers import make_password, check_password
+from adminui.passwords import hash_password
 from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
 from .models import Student, Submission
 from adminui.models import Problem
 from student.decorato import student_login_required
+from student import leaderboard
+from student.next_problem import aget_next_problem, get_next_problem
+from student.uploads import SubmissionUploadHandler
+from student.downloads import acan_view_submission, aserve_file
+from adminui.pagination import apaginate
+from asgiref.sync import sync_to_async
 from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.http import Http404
 
 
 # ----- Registration & Login -----
@@ -28,7 +37,7 @@ def register_login(request):
                 Student.objects.create(
                     full_name=full_name,
                     student_id=student_id,
-                    password=make_password(password),
+                    password=hash_password("student", password),
                     gender=gender,
                     year=year,
                     semester=semester,
@@ -41,7 +50,7 @@ def register_login(request):
             password = request.POST.get("password")
             try:
                 student = Student.objects.get(student_id=student_id)
-                if check_password(password, student.password):
+                if student.check_password(password):
                     # Set session AFTER successful login only
                     request.session["student_id"] = student.id
                     request.session["student_name"] = student.full_name
@@ -62,22 +71,20 @@ def register_login(request):
 # ----- Student Dashboard -----
 @student_login_required
 @never_cache
-def student_dashboard(request):
-    student_id = request.session.get("student_id")
-    student = get_object_or_404(Student, id=student_id)
+async def student_dashboard(request):
+    student = await request.astudent()
 
-    submissions_list = Submission.objects.filter(student=student).order_by("-submitted_at")
-    paginator = Paginator(submissions_list, 3)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    submissions_list = Submission.objects.filter(student=student).select_related("problem").order_by("-submitted_at")
+    page_obj = await apaginate(submissions_list, 3, request.GET.get("page"))
 
-    submitted_problem_ids = submissions_list.values_list("problem_id", flat=True)
-    next_problem = Problem.objects.exclude(id__in=submitted_problem_ids).order_by("created_at").first()
+    next_problem = await aget_next_problem(student.id)
 
-    response = render(request, "student/student_dashboard.html", {
+    # Rendering reads the session and messages, which are sync-only
+    response = await sync_to_async(render)(request, "student/student_dashboard.html", {
         "student": student,
         "next_problem": next_problem,
         "page_obj": page_obj,
+        "standing": await leaderboard.astanding(student),
     })
     response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
     response['Pragma'] = 'no-cache'
@@ -86,27 +93,45 @@ def student_dashboard(request):
 
 
 # ----- Submit Solution -----
+# CSRF is checked inside, after the upload handler is installed: the
+# middleware would otherwise parse the body with the default handlers first.
+@csrf_exempt
 @student_login_required
 @never_cache
 def submit_solution(request, problem_id):
-    student_id = request.session.get("student_id")
-    student = get_object_or_404(Student, id=student_id)
     problem = get_object_or_404(Problem, id=problem_id)
+    request.upload_handlers = [SubmissionUploadHandler(request, problem)]
+    return _submit_solution(request, problem)
+
+
+@csrf_protect
+def _submit_solution(request, problem):
+    student = request.student
 
     error_message = ""
     success_message = ""
 
     if request.method == "POST":
         file = request.FILES.get("file")
-        if not file:
+        if request.upload_error:
+            error_message = request.upload_error
+        elif not file:
             error_message = "Please select a file to submit."
         elif Submission.objects.filter(student=student, problem=problem).exists():
             error_message = "You have already submitted this problem."
         else:
-            Submission.objects.create(problem=problem, student=student, file=file)
-            success_message = "Solution submitted successfully!"
-
-    next_problem = Problem.objects.exclude(submissions__student=student).first()
+            submission = Submission(problem=problem, student=student, file=file, original_name=file.name)
+            try:
+                with transaction.atomic():
+                    submission.save()
+                success_message = "Solution submitted successfully!"
+            except IntegrityError:
+                # A concurrent request for the same problem won the unique constraint. The stored blob
+                # is left alone: an identical upload may be about to reference it, so unreferenced
+                # blobs are reclaimed by "dedupe_submissions --delete-orphans" instead.
+                error_message = "You have already submitted this problem."
+
+    next_problem = get_next_problem(student.id)
     submissions = Submission.objects.filter(student=student).order_by("-submitted_at")
     paginator = Paginator(submissions, 5)
     page_number = request.GET.get("page")
@@ -136,3 +161,28 @@ def student_logout(request):
 
     # Redirect to user selection page
     return redirect("login_options")
+
+
+# ----- Submission File -----
+# No never_cache here: aserve_file marks the response private and revalidated
+# so browsers can use ETag / Last-Modified.
+async def download_submission(request, submission_id):
+    submission = await aget_object_or_404(Submission, id=submission_id)
+    if not await acan_view_submission(request, submission):
+        user = await request.auser()
+        if not (user.is_authenticated or await request.session.aget("faculty_id") or await request.session.aget("student_id")):
+            return redirect("login_options")
+        raise Http404("Submission not found")
+    storage = submission.file.storage
+    if not submission.file or not await sync_to_async(storage.exists, thread_sensitive=False)(submission.file.name):
+        raise Http404("File not found")
+    return await aserve_file(request, storage, submission.file.name, submission.original_name)
+
+
+# No never_cache either: thumbnails revalidate like the files they preview.
+async def submission_preview(request, submission_id):
+    submission = await aget_object_or_404(Submission.objects.select_related("preview"), id=submission_id)
+    preview = getattr(submission, "preview", None)
+    if not await acan_view_submission(request, submission) or not preview or not preview.image:
+        raise Http404("Preview not found")
+    return await aserve_file(request, preview.image.storage, preview.image.name)